@@ -0,0 +1,13 @@
+import benchmark
+
+def test_empty_depths_are_skipped(capsys):
+  report = benchmark.run_benchmark(['table', 'idastar'], [2, 32], per_depth=3)
+  assert list(report['results']['table']) == ['2']
+  assert report['results']['idastar']['2']['instances'] == 3
+  assert 'depth 32' in capsys.readouterr().err
+
+def test_compare_flags_regressions():
+  base = {'results': {'astar': {'5': {'time': 1.0, 'expanded': 10, 'generated': 20, 'peak_memory': 100}}}}
+  new = {'results': {'astar': {'5': {'time': 1.05, 'expanded': 20, 'generated': 20, 'peak_memory': 100}}}}
+  regressions = benchmark.compare(base, new)
+  assert len(regressions) == 1 and 'expanded' in regressions[0]
@@ -0,0 +1,61 @@
+from cache import SolutionCache
+from puzzle import EightPuzzle
+
+start = [1, 2, 5, 3, 4, 0, 6, 7, 8]
+
+def test_suffix_hits():
+  cache = SolutionCache()
+  path = EightPuzzle(list(start)).solve_astar()
+  assert cache.get(start) is None
+  cache.put(path)
+  assert len(cache) == len(path)
+  # Every state on an optimal path has its own optimal suffix cached
+  for i, state in enumerate(path):
+    assert cache.get(state) == path[i:]
+  assert (cache.hits, cache.misses) == (len(path), 1)
+
+def test_unsolvable_is_cached():
+  cache = SolutionCache()
+  state = [0, 2, 1, 3, 4, 5, 6, 7, 8]
+  assert cache.solve(EightPuzzle(list(state))) is None
+  assert cache.contains(state)
+  assert cache.solve(EightPuzzle(list(state))) is None
+  assert cache.hits == 1
+
+def test_lru_eviction():
+  goal = list(range(9))
+  near = [[1, 0, 2, 3, 4, 5, 6, 7, 8], goal]
+  far = [[3, 1, 2, 0, 4, 5, 6, 7, 8], goal]
+  other = [[1, 2, 0, 3, 4, 5, 6, 7, 8], [1, 0, 2, 3, 4, 5, 6, 7, 8], goal]
+
+  cache = SolutionCache(maxsize=2)
+  cache.put(near)
+  cache.put(far)
+  # The goal is shared by both paths, so the older start state is the one evicted
+  assert len(cache) == 2
+  assert not cache.contains(near[0])
+  assert cache.get(far[0]) == far
+
+  cache = SolutionCache(maxsize=3)
+  cache.put(near)
+  cache.put(far)
+  cache.get(near[0])
+  cache.put(other)
+  # Reading a path marks it recently used, so the unread start state goes first
+  assert not cache.contains(far[0])
+  assert cache.get(near[0]) == near
+  assert cache.get(other[0]) == other
+
+def test_solve_with_options_and_store(tmp_path):
+  path = str(tmp_path / 'solutions.db')
+  cache = SolutionCache(path=path)
+  solved = cache.solve(EightPuzzle(list(start)), 'solve_idastar', heuristic='linear')
+  cache.close()
+
+  # A new cache on the same file answers from disk, without searching
+  cache = SolutionCache(path=path)
+  puzzle = EightPuzzle(list(start))
+  assert cache.solve(puzzle) == solved
+  assert puzzle.nodes_expanded == 0
+  assert cache.hits == 1
+  cache.close()
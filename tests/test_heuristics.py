@@ -0,0 +1,22 @@
+import heuristics
+import pytest
+import utils
+
+# Half of the 9! permutations can reach the goal
+solvable_states = utils.factorials[utils.num_tiles] // 2
+
+@pytest.fixture(scope='module')
+def manhattan_total():
+  return heuristics.verify('manhattan')[1]
+
+@pytest.mark.parametrize('name, consistent', [('manhattan', True), ('linear', True), ('wd', True), ('pdb', False)])
+def test_verify(name, consistent, manhattan_total):
+  # verify asserts admissibility, that update matches evaluate and, where claimed, consistency
+  checked, total, exact = heuristics.verify(name)
+  assert heuristics.get_heuristic(name, utils.board_len).consistent == consistent
+  assert checked == solvable_states
+  assert manhattan_total <= total <= exact
+
+def test_unknown_heuristic():
+  with pytest.raises(ValueError):
+    heuristics.get_heuristic('euclid', utils.board_len)
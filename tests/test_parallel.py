@@ -0,0 +1,48 @@
+import multiprocessing as mp
+import os
+import parallel
+import pytest
+
+from generate import generate
+from puzzle import EightPuzzle, FifteenPuzzle
+from tests.test_puzzle import assert_legal, walk
+from utils import move_tables
+
+instances = list(generate(count=8, seed=21))
+
+fork_only = pytest.mark.skipif(mp.get_start_method() != 'fork', reason='the patched worker only reaches forked processes')
+
+def _dies_when_asked(index, count, side, goal, heuristic, batch_size, inboxes, results, incumbent, lock, sent, received, idle):
+  # Claims a solution at once, then dies when the coordinator rebuilds the path
+  while True:
+    message = inboxes[index].get()
+    if message[0] == 'nodes':
+      incumbent.value = 0
+      received[index] += 1
+      idle[index] = 1
+    else:
+      os._exit(1)
+
+@fork_only
+def test_worker_dying_after_the_search_raises(monkeypatch):
+  monkeypatch.setattr(parallel, '_worker', _dies_when_asked)
+  with pytest.raises(RuntimeError):
+    parallel.hda_star([1, 0, 2, 3, 4, 5, 6, 7, 8], 3, list(range(9)), workers=1)
+
+@pytest.mark.parametrize('heuristic', ['manhattan', 'pdb'])
+def test_parallel_is_optimal(heuristic):
+  for state in instances:
+    path = EightPuzzle(list(state)).solve_parallel(workers=2, heuristic=heuristic)
+    assert len(path) == len(EightPuzzle(list(state)).solve_table())
+    assert_legal(path, state, EightPuzzle.goal_state)
+
+def test_parallel_fifteen_puzzle():
+  state = walk(4, 40, 2)
+  path = FifteenPuzzle(list(state)).solve_parallel(workers=2, heuristic='pdb')
+  assert len(path) == len(FifteenPuzzle(list(state)).solve_idastar(heuristic='pdb'))
+  assert_legal(path, state, list(range(16)), move_tables(4))
+
+def test_parallel_trivial_cases():
+  goal = list(range(9))
+  assert EightPuzzle(list(goal)).solve_parallel(workers=2) == [goal]
+  assert EightPuzzle([0, 2, 1, 3, 4, 5, 6, 7, 8]).solve_parallel(workers=2) is None
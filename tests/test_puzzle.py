@@ -0,0 +1,101 @@
+import pytest
+
+from generate import generate, state_at_depth
+from puzzle import EightPuzzle, FifteenPuzzle, TwentyFourPuzzle
+from random import Random
+from utils import move_table, move_tables
+
+def assert_legal(path: list[list[int]], start: list[int], goal: list[int], moves: list[tuple[int, ...]] = move_table) -> None:
+  assert path[0] == start
+  assert path[-1] == goal
+  for before, after in zip(path, path[1:]):
+    # One tile and the blank swap places, and they were adjacent
+    changed = [index for index in range(len(before)) if before[index] != after[index]]
+    assert len(changed) == 2
+    a, b = changed
+    assert 0 in (before[a], before[b])
+    assert b in moves[a]
+
+def walk(side: int, steps: int, seed: int) -> list[int]:
+  """
+  Shuffles the goal by a random walk that never undoes its last move, so larger boards get
+  instances shallow enough to solve quickly.
+  """
+
+  random = Random(seed)
+  moves = move_tables(side)
+  state = list(range(side * side))
+  z, previous = 0, None
+  for _ in range(steps):
+    cell = random.choice([cell for cell in moves[z] if cell != previous])
+    state[z], state[cell] = state[cell], 0
+    z, previous = cell, z
+  return state
+
+@pytest.mark.parametrize('state', list(generate(count=20, seed=5)))
+def test_idastar_matches_astar_and_table(state):
+  astar = EightPuzzle(list(state)).solve_astar()
+  idastar = EightPuzzle(list(state)).solve_idastar()
+  exact = EightPuzzle(list(state)).solve_table()
+  assert len(idastar) == len(astar) == len(exact)
+  assert_legal(idastar, state, EightPuzzle.goal_state)
+  assert_legal(astar, state, EightPuzzle.goal_state)
+
+@pytest.mark.parametrize('depth', [0, 1, 12, 24, 31])
+def test_solvers_at_exact_depth(depth):
+  state = state_at_depth(depth, Random(depth))
+  assert len(EightPuzzle(list(state)).solve_idastar()) - 1 == depth
+  assert len(EightPuzzle(list(state)).solve_astar()) - 1 == depth
+
+def test_unsolvable_returns_none():
+  state = [0, 2, 1, 3, 4, 5, 6, 7, 8]
+  assert EightPuzzle(list(state)).solve_idastar() is None
+  assert EightPuzzle(list(state)).solve_astar() is None
+
+@pytest.mark.parametrize('mm', [False, True])
+def test_bidirectional_is_optimal(mm):
+  for state in generate(count=10, seed=11):
+    exact = EightPuzzle(list(state)).solve_table()
+    path = EightPuzzle(list(state)).solve_bidirectional(mm=mm)
+    assert len(path) == len(exact)
+    assert_legal(path, state, EightPuzzle.goal_state)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_fifteen_puzzle_solvers_agree(seed):
+  state = walk(4, 40, seed)
+  goal = list(range(16))
+  astar = FifteenPuzzle(list(state)).solve_astar()
+  lengths = {len(astar)}
+  for heuristic in ('manhattan', 'linear', 'pdb'):
+    path = FifteenPuzzle(list(state)).solve_idastar(heuristic=heuristic)
+    assert_legal(path, state, goal, move_tables(4))
+    lengths.add(len(path))
+  assert_legal(astar, state, goal, move_tables(4))
+  assert len(lengths) == 1
+
+def test_twenty_four_puzzle():
+  # 5 bits per cell: 125-bit packed states, kept in the arena's list column
+  state = walk(5, 24, 3)
+  goal = list(range(25))
+  astar = TwentyFourPuzzle(list(state)).solve_astar()
+  idastar = TwentyFourPuzzle(list(state)).solve_idastar(heuristic='linear')
+  assert len(astar) == len(idastar) <= 25
+  assert_legal(astar, state, goal, move_tables(5))
+  assert_legal(idastar, state, goal, move_tables(5))
+
+@pytest.mark.parametrize('weight', [1, 3])
+def test_anytime_improves_to_optimal(weight):
+  improved = 0
+  for state in generate(count=10, seed=13):
+    paths = list(EightPuzzle(list(state)).solve_anytime(weight=weight))
+    improved += len(paths) > 1
+    lengths = [len(path) for path in paths]
+    assert lengths == sorted(set(lengths), reverse=True)
+    assert lengths[-1] == len(EightPuzzle(list(state)).solve_table())
+    for path in paths:
+      assert_legal(path, state, EightPuzzle.goal_state)
+  # A weight of 1 is plain A*, whose first path is already optimal
+  assert improved == 0 if weight == 1 else improved > 0
+
+def test_anytime_unsolvable_yields_nothing():
+  assert list(EightPuzzle([0, 2, 1, 3, 4, 5, 6, 7, 8]).solve_anytime(weight=3)) == []
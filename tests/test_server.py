@@ -0,0 +1,83 @@
+import io
+import json
+import os
+import pytest
+import solve
+import subprocess
+import sys
+import time
+
+from client import SolverClient, find_server
+from generate import generate
+from puzzle import EightPuzzle
+from utils import state2str
+
+server_script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'visual_search', 'server.py')
+states = list(generate(count=12, seed=31))
+
+@pytest.fixture(scope='module')
+def address(tmp_path_factory):
+  path = str(tmp_path_factory.mktemp('server') / 'solver.sock')
+  process = subprocess.Popen([sys.executable, server_script, '-a', path, '-w', '2'], stderr=subprocess.DEVNULL)
+  try:
+    deadline = time.monotonic() + 60.0
+    while find_server(path) is None:
+      assert process.poll() is None, 'the server exited'
+      assert time.monotonic() < deadline, 'the server did not start'
+      time.sleep(0.05)
+    yield path
+  finally:
+    process.terminate()
+    process.wait(timeout=10)
+  # The socket file is removed on SIGTERM
+  assert not os.path.exists(path)
+
+def test_solve_matches_local(address):
+  with SolverClient(address) as client:
+    for state in states[:4]:
+      assert client.solve(state) == EightPuzzle(list(state)).solve_astar()
+    assert client.solve([0, 2, 1, 3, 4, 5, 6, 7, 8]) is None
+
+def test_pipelined_answers_keep_order(address):
+  with SolverClient(address) as client:
+    results = list(client.solve_many(states, solver='idastar', window=5))
+  assert [result['path'][0] for result in results] == [state2str(state) for state in states]
+  assert [result['length'] for result in results] == [len(EightPuzzle(list(state)).solve_table()) - 1 for state in states]
+
+@pytest.mark.parametrize('request_line', [
+  'SOLVE 12345678x',
+  'SOLVE 1234567',
+  'SOLVE 012345678 depth=3',
+  'SOLVE 012345678 solver=bfs heuristic=linear',
+  'SOLVE',
+  'FETCH 012345678'
+])
+def test_malformed_requests_get_errors(address, request_line):
+  with SolverClient(address) as client:
+    client._send([request_line])
+    assert client._receive().startswith('ERR ')
+    # The connection stays usable
+    client._send(['PING'])
+    assert client._receive().strip() == 'PONG'
+
+def test_stats(address):
+  with SolverClient(address) as client:
+    client.solve(states[0])
+    stats = client.stats()
+  for field in ('uptime', 'requests', 'completed', 'errors', 'batches', 'mean_batch', 'in_flight',
+                'throughput', 'recent_throughput', 'p50_ms', 'p99_ms', 'max_ms'):
+    assert field in stats
+  assert stats['completed'] >= 1
+
+def test_run_remote_matches_run(address):
+  lines = [state2str(state) + '\n' for state in states] + ['not a state\n', '\n', '102345678\n']
+
+  # Everything but the solve times must match
+  def results(write) -> list[dict]:
+    out = io.StringIO()
+    write(out)
+    return [{key: value for key, value in json.loads(line).items() if key != 'time'} for line in out.getvalue().splitlines()]
+
+  local = results(lambda out: solve.run(lines, out, 'idastar', workers=1))
+  remote = results(lambda out: solve.run_remote(lines, out, address, 'idastar'))
+  assert remote == local
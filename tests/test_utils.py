@@ -0,0 +1,120 @@
+import pytest
+import table
+
+from generate import generate
+from itertools import permutations
+from puzzle import EightPuzzle
+from random import Random
+from utils import Node, OpenList, SearchStats, bits_for, cached_table, factorials, load_table, pack, rank, rank_packed, solvable, unrank
+
+def test_open_list_orders_by_f_then_h():
+  open_list = OpenList()
+  open_list.push(Node(1, 0, g=3, h=2))
+  open_list.push(Node(2, 0, g=1, h=4))
+  open_list.push(Node(3, 0, g=0, h=4))
+  assert [open_list.pop().state for _ in range(3)] == [3, 1, 2]
+  assert not open_list
+
+def test_open_list_decrease_key():
+  open_list = OpenList()
+  assert open_list.push(Node(1, 0, g=5, h=3))
+  assert open_list.push(Node(2, 0, g=4, h=3))
+  # A cheaper path to a queued state replaces it; an equal or dearer one is rejected
+  assert open_list.push(Node(1, 0, g=2, h=3))
+  assert not open_list.push(Node(1, 0, g=2, h=3))
+  assert not open_list.push(Node(2, 0, g=6, h=3))
+
+  assert len(open_list) == 2
+  assert open_list.get(1).g == 2
+  assert open_list.peek().state == 1
+  first, second = open_list.pop(), open_list.pop()
+  assert (first.state, first.g) == (1, 2)
+  assert (second.state, second.g) == (2, 4)
+  # The superseded entry is skipped, not returned
+  with pytest.raises(KeyError):
+    open_list.pop()
+
+def test_cached_table_rebuilds_bad_file(tmp_path):
+  path = str(tmp_path / 'table.bin')
+  builds = []
+  def build():
+    builds.append(1)
+    return bytearray(range(8))
+
+  assert bytes(cached_table(path, 8, build)) == bytes(range(8))
+  assert bytes(cached_table(path, 8, build)) == bytes(range(8))
+  assert len(builds) == 1
+  # An empty or truncated file, e.g. from an interrupted write, is rebuilt rather than raising
+  open(path, 'wb').close()
+  with pytest.raises(ValueError):
+    load_table(path, 8)
+  assert bytes(cached_table(path, 8, build)) == bytes(range(8))
+  assert len(builds) == 2
+  assert list(tmp_path.iterdir()) == [tmp_path / 'table.bin'] # No temporary file left over
+
+def test_solvable():
+  goal = list(range(9))
+  assert solvable(goal)
+  assert solvable([1, 0, 2, 3, 4, 5, 6, 7, 8])
+  # Swapping two tiles flips the permutation parity but not the blank's
+  assert not solvable([0, 2, 1, 3, 4, 5, 6, 7, 8])
+  # Solvability is relative to the goal
+  other = [1, 2, 3, 8, 0, 4, 7, 6, 5]
+  assert solvable(other, other)
+  assert not solvable(goal, other)
+  assert solvable([0, 1, 2, 3, 4, 5, 6, 8, 7], other)
+
+def test_solvable_matches_distance_table():
+  distances = table.distance_table()
+  random = Random(7)
+  for _ in range(500):
+    state = random.sample(range(9), 9)
+    assert solvable(state) == (distances[rank(state)] != table.unreachable)
+
+def test_solvable_even_side():
+  goal = list(range(16))
+  # On a 4x4 board the blank's row counts too: moving it down a row is one move
+  assert solvable([4, 1, 2, 3, 0] + goal[5:], side=4)
+  assert not solvable([4, 1, 2, 3, 0, 6, 5] + goal[7:], side=4)
+
+def test_rank_is_lexicographic():
+  # Every permutation of a short length, in lexicographic order, ranks to its position
+  for r, state in enumerate(permutations(range(5))):
+    assert rank(list(state)) == r
+    assert unrank(r, 5) == list(state)
+
+@pytest.mark.parametrize('n', [9, 16, 25])
+def test_rank_round_trip(n):
+  random = Random(n)
+  bits = bits_for(n)
+  states = [list(range(n)), list(range(n))[::-1]] + [random.sample(range(n), n) for _ in range(200)]
+  for state in states:
+    r = rank(state)
+    assert 0 <= r < factorials[n]
+    assert unrank(r, n) == state
+    assert rank_packed(pack(state, bits), n, bits) == r
+  assert rank(list(range(n))[::-1]) == factorials[n] - 1
+
+@pytest.mark.parametrize('solver', ['solve_astar', 'solve_idastar'])
+def test_search_stats_hooks(solver):
+  state = next(generate(count=1, seed=17))
+  expanded, generated, solutions = [], [], []
+  stats = SearchStats(on_expand=expanded.append, on_generate=generated.append, on_solution=solutions.append)
+  path = getattr(EightPuzzle(list(state)), solver)(stats=stats)
+  assert len(expanded) == stats.expanded > 0
+  assert len(generated) == stats.generated > 0
+  assert solutions == [path]
+  assert stats.f_bounds == sorted(stats.f_bounds)
+  assert stats.f_bounds[-1] == len(path) - 1
+
+def test_search_stats_detailed():
+  state = next(generate(count=1, seed=17))
+  plain, detailed = SearchStats(), SearchStats(detailed=True)
+  EightPuzzle(list(state)).solve_astar(stats=plain)
+  EightPuzzle(list(state)).solve_astar(stats=detailed)
+  assert detailed.expanded == plain.expanded
+  assert detailed.heap_time > 0 and detailed.heuristic_time > 0 and detailed.neighbor_time > 0
+  assert detailed.peak_open > 0 and detailed.peak_closed > 0
+  # Without detailed or hooks only the counters are kept
+  assert (plain.heap_time, plain.heuristic_time, plain.neighbor_time) == (0, 0, 0)
+  assert (plain.peak_open, plain.peak_closed) == (0, 0)
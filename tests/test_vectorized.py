@@ -0,0 +1,25 @@
+import pytest
+import table
+import utils
+
+from generate import generate
+from puzzle import SlidingPuzzle
+
+# NumPy is only needed for the vectorized engine
+pytest.importorskip('numpy')
+import vectorized
+
+def test_distance_table_matches():
+  assert vectorized.build_distance_table() == table.build_distance_table()
+
+@pytest.mark.parametrize('side', [3, 4, 5])
+def test_manhattan_and_rank(side):
+  states = list(generate(count=50, side=side, seed=side))
+  scores = vectorized.manhattan(vectorized.to_array(states), side)
+  assert [int(score) for score in scores] == [SlidingPuzzle(list(state)).heuristic(state) for state in states]
+  if side * side <= 20:
+    ranks = vectorized.rank(vectorized.to_array(states))
+    assert [int(r) for r in ranks] == [utils.rank(state) for state in states]
+  else:
+    with pytest.raises(ValueError):
+      vectorized.rank(vectorized.to_array(states))
@@ -0,0 +1,51 @@
+import time
+
+from puzzle import EightPuzzle
+from worker import SolverWorker
+
+state = [1, 2, 5, 3, 4, 0, 6, 7, 8]
+# A 15-puzzle instance far too hard to finish while a test runs
+hard_state = [0, 15, 14, 13, 12, 11, 10, 9, 8, 7, 6, 5, 4, 3, 1, 2]
+
+def wait(worker: SolverWorker, timeout: float = 30.0) -> SolverWorker:
+  deadline = time.monotonic() + timeout
+  while not worker.poll():
+    assert time.monotonic() < deadline, 'the worker did not finish'
+    time.sleep(0.01)
+  return worker
+
+def test_solvers_without_progress_run_locally():
+  worker = wait(SolverWorker(state, 'solve_table'))
+  assert worker.error is None and not worker.cancelled
+  assert worker.result == EightPuzzle(list(state)).solve_astar()
+
+def test_failure_is_reported():
+  worker = wait(SolverWorker(state, 'solve_nothing'))
+  assert worker.error.startswith('AttributeError')
+  assert worker.result is None
+
+def test_unreachable_server_falls_back_to_local():
+  worker = wait(SolverWorker(state, 'solve_table', address='/nonexistent/visual_search.sock'))
+  assert worker.error is None
+  assert len(worker.result) == len(EightPuzzle(list(state)).solve_astar())
+
+def test_dead_worker_is_a_failure():
+  worker = SolverWorker(hard_state, 'solve_idastar')
+  worker._process.kill()
+  wait(worker)
+  assert not worker.cancelled
+  assert worker.result is None
+  assert 'exited' in worker.error
+
+def test_cancel():
+  worker = SolverWorker(hard_state, 'solve_idastar')
+  deadline = time.monotonic() + 30.0
+  while not worker.poll() and worker.expanded == 0:
+    assert time.monotonic() < deadline, 'no progress was reported'
+    time.sleep(0.01)
+  worker.cancel()
+  wait(worker)
+  assert worker.cancelled
+  assert worker.error is None
+  assert worker.result is None
+  assert worker.expanded > 0
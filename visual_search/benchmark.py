@@ -0,0 +1,212 @@
+"""Benchmarks the solvers on fixed, seeded 8-puzzle instances binned by optimal depth."""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from puzzle import EightPuzzle
+from random import Random
+from generate import depth_ranks
+from utils import unrank
+
+default_depths: list[int] = [5, 10, 15, 20, 25, 31]
+
+def _anytime(puzzle: EightPuzzle) -> list[list[int]]:
+  path = None
+  for path in puzzle.solve_anytime():
+    pass
+  return path
+
+# Solver name to a function running it on a puzzle
+solvers: dict = {
+  'astar': EightPuzzle.solve_astar,
+  'astar-compact': lambda puzzle: puzzle.solve_astar(compact=True),
+  'astar-linear': lambda puzzle: puzzle.solve_astar(heuristic='linear'),
+  'astar-wd': lambda puzzle: puzzle.solve_astar(heuristic='wd'),
+  'astar-pdb': lambda puzzle: puzzle.solve_astar(heuristic='pdb'),
+  'idastar': EightPuzzle.solve_idastar,
+  'idastar-linear': lambda puzzle: puzzle.solve_idastar(heuristic='linear'),
+  'idastar-pdb': lambda puzzle: puzzle.solve_idastar(heuristic='pdb'),
+  'bfs': EightPuzzle.solve_bidirectional,
+  'mm': lambda puzzle: puzzle.solve_bidirectional(mm=True),
+  'anytime': _anytime,
+  'table': EightPuzzle.solve_table
+}
+
+def instances(depths: list[int], per_depth: int, seed: int = 0) -> dict[int, list[list[int]]]:
+  """
+  Picks a fixed set of states at each exact optimal depth.
+
+  The states come from the distance table, so the same seed always gives the same instances.
+  Depths with fewer states than per_depth (31 has only two) use all of them.
+
+  Args:
+  - depths (list[int]): The optimal solution lengths to sample.
+  - per_depth (int): The number of states per depth.
+  - seed (int, optional): The seed for the sample. Default is 0.
+
+  Returns:
+  - dict[int, list[list[int]]]: The states for each depth.
+  """
+
+  ranks = depth_ranks()
+  rng = Random(seed)
+  sets: dict[int, list[list[int]]] = {}
+  for depth in depths:
+    pool = ranks.get(depth, [])
+    sets[depth] = [unrank(r) for r in rng.sample(pool, min(per_depth, len(pool)))]
+  return sets
+
+def measure(solver: str, states: list[list[int]]) -> dict:
+  """
+  Runs one solver on a set of states and summarizes the cost.
+
+  Timing and node counts come from a plain run; peak memory from a second run under tracemalloc,
+  which would otherwise distort the timing.
+
+  Args:
+  - solver (str): The solver name (a key of solvers).
+  - states (list[list[int]]): The states to solve.
+
+  Returns:
+  - dict: Mean time, mean nodes expanded, generated and pruned as duplicates, nodes per second,
+    and the largest peak memory in bytes.
+  """
+
+  run = solvers[solver]
+  elapsed: float = 0.0
+  expanded: int = 0
+  generated: int = 0
+  duplicates: int = 0
+  for state in states:
+    puzzle = EightPuzzle(list(state))
+    start = time.perf_counter()
+    run(puzzle)
+    elapsed += time.perf_counter() - start
+    expanded += puzzle.stats.expanded
+    generated += puzzle.stats.generated
+    duplicates += puzzle.stats.duplicates
+
+  peak: int = 0
+  tracemalloc.start()
+  for state in states:
+    puzzle = EightPuzzle(list(state))
+    tracemalloc.reset_peak()
+    run(puzzle)
+    peak = max(peak, tracemalloc.get_traced_memory()[1])
+  tracemalloc.stop()
+
+  count: int = len(states)
+  return {
+    'instances': count,
+    'time': elapsed / count,
+    'expanded': expanded / count,
+    'generated': generated / count,
+    'duplicates': duplicates / count,
+    'nodes_per_sec': expanded / elapsed if elapsed else 0.0,
+    'peak_memory': peak
+  }
+
+def run_benchmark(names: list[str], depths: list[int], per_depth: int, seed: int = 0) -> dict:
+  """
+  Benchmarks each solver on every depth bin.
+
+  Args:
+  - names (list[str]): The solver names.
+  - depths (list[int]): The optimal solution lengths to sample.
+  - per_depth (int): The number of states per depth.
+  - seed (int, optional): The seed for the instance sample. Default is 0.
+
+  Returns:
+  - dict: The run settings under 'meta' and results[solver][depth] from measure. Depths with no
+    states are left out.
+  """
+
+  sets = instances(depths, per_depth, seed)
+  for depth in [depth for depth, states in sets.items() if not states]:
+    print(f'no 8-puzzle states at depth {depth}, skipped', file=sys.stderr)
+    del sets[depth]
+  results: dict = {}
+  for name in names:
+    results[name] = {}
+    for depth, states in sets.items():
+      results[name][str(depth)] = measure(name, states)
+      print(f'{name:>14} depth {depth:>2}: {results[name][str(depth)]["time"] * 1000:9.2f} ms', file=sys.stderr)
+
+  return {
+    'meta': {
+      'seed': seed,
+      'per_depth': per_depth,
+      'python': platform.python_version(),
+      'machine': platform.machine(),
+      'time': time.strftime('%Y-%m-%dT%H:%M:%S')
+    },
+    'results': results
+  }
+
+def compare(base: dict, new: dict, threshold: float = 0.1) -> list[str]:
+  """
+  Lists the metrics that got worse by more than a threshold between two benchmark runs.
+
+  Args:
+  - base (dict): The baseline run.
+  - new (dict): The run to check.
+  - threshold (float, optional): The allowed relative increase. Default is 0.1 (10%).
+
+  Returns:
+  - list[str]: One line per regression.
+  """
+
+  regressions: list[str] = []
+  for solver, depths in new['results'].items():
+    for depth, metrics in depths.items():
+      old = base['results'].get(solver, {}).get(depth)
+      if old is None:
+        continue
+      for metric in ('time', 'expanded', 'generated', 'peak_memory'):
+        if old[metric] and metrics[metric] > old[metric] * (1 + threshold):
+          change = metrics[metric] / old[metric] - 1
+          regressions.append(f'{solver} depth {depth} {metric}: {old[metric]:.6g} -> {metrics[metric]:.6g} (+{change:.0%})')
+  return regressions
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark the 8-puzzle solvers.')
+  commands = parser.add_subparsers(dest='command', required=True)
+
+  run_parser = commands.add_parser('run', help='run the benchmark and write JSON')
+  run_parser.add_argument('-o', '--output', default='-', help='output file (default: stdout)')
+  run_parser.add_argument('-s', '--solvers', nargs='+', choices=sorted(solvers), default=['astar', 'idastar', 'mm'])
+  run_parser.add_argument('-d', '--depths', nargs='+', type=int, default=default_depths)
+  run_parser.add_argument('-n', '--per-depth', type=int, default=10, help='instances per depth (default: 10)')
+  run_parser.add_argument('--seed', type=int, default=0)
+
+  compare_parser = commands.add_parser('compare', help='flag regressions between two runs')
+  compare_parser.add_argument('base', help='baseline JSON')
+  compare_parser.add_argument('new', help='JSON to check')
+  compare_parser.add_argument('-t', '--threshold', type=float, default=0.1, help='allowed relative increase (default: 0.1)')
+
+  args = parser.parse_args()
+  if args.command == 'run':
+    deepest = max(depth_ranks())
+    for depth in args.depths:
+      if not 0 <= depth <= deepest:
+        parser.error(f'depths must be from 0 to {deepest}, not {depth}')
+    if args.per_depth < 1:
+      parser.error('--per-depth must be at least 1')
+    report = run_benchmark(args.solvers, args.depths, args.per_depth, args.seed)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    with out:
+      json.dump(report, out, indent=2)
+      out.write('\n')
+  else:
+    with open(args.base) as file:
+      base = json.load(file)
+    with open(args.new) as file:
+      new = json.load(file)
+    regressions = compare(base, new, args.threshold)
+    for line in regressions:
+      print(line)
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,208 @@
+"""Solution cache with suffix reuse, LRU eviction and an optional sqlite store."""
+
+import sqlite3
+
+from collections import OrderedDict
+from utils import state2str, tile_chars
+
+class SolutionCache:
+  """
+  Caches optimal solution paths so repeated and overlapping queries skip the search.
+
+  Every suffix of an optimal path is itself optimal, so caching a path stores one entry for
+  each state on it: the next state toward the goal and the number of moves left. A path is read
+  back by following next links, and any state on a cached path is a hit.
+
+  Parameters:
+  - maxsize (int, optional): The maximum number of states held in memory. Default is 100000.
+  - path (str, optional): A sqlite database file that keeps entries across restarts. Default is None.
+
+  Attributes:
+  - maxsize (int): The maximum number of states held in memory.
+  - hits (int): The number of lookups answered from the cache.
+  - misses (int): The number of lookups that needed a search.
+  - _entries (OrderedDict[str, tuple[str, int]]): Maps a key to (next state string, moves left), least recently used first.
+  - _db (sqlite3.Connection): The backing store, or None.
+
+  Methods:
+  - get(state: list[int], goal: list[int]) -> list[list[int]]: Returns the cached path from state, or None.
+  - contains(state: list[int], goal: list[int]) -> bool: Checks whether a state has a cached result.
+  - put(path: list[list[int]]): Caches a path and all of its suffixes.
+  - solve(puzzle, solver: str, **options) -> list[list[int]]: Returns a cached path, or solves and caches it.
+  - close(): Closes the backing store.
+  """
+
+  # Moves left for states known to be unsolvable
+  _unsolvable: int = -1
+
+  def __init__(self, maxsize: int = 100000, path: str = None) -> None:
+    self.maxsize: int = maxsize
+    self.hits: int = 0
+    self.misses: int = 0
+    self._entries: OrderedDict[str, tuple[str, int]] = OrderedDict()
+    self._db: sqlite3.Connection = None
+    if path is not None:
+      self._db = sqlite3.connect(path)
+      self._db.execute('CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, next TEXT, remaining INTEGER)')
+      self._db.commit()
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  @staticmethod
+  def _key(statestr: str, goalstr: str) -> str:
+    return f'{goalstr}:{statestr}'
+
+  def _lookup(self, key: str) -> tuple[str, int]:
+    """
+    Finds an entry in memory, then in the backing store, and marks it recently used.
+
+    Args:
+    - key (str): The entry key.
+
+    Returns:
+    - tuple[str, int] or None: (next state string, moves left), or None if the key is not cached.
+    """
+
+    entry = self._entries.get(key)
+    if entry is not None:
+      self._entries.move_to_end(key)
+      return entry
+    if self._db is not None:
+      row = self._db.execute('SELECT next, remaining FROM solutions WHERE key = ?', (key,)).fetchone()
+      if row is not None:
+        self._store(key, (row[0], row[1]))
+        return row[0], row[1]
+    return None
+
+  def _store(self, key: str, entry: tuple[str, int]) -> None:
+    self._entries[key] = entry
+    self._entries.move_to_end(key)
+    while len(self._entries) > self.maxsize:
+      self._entries.popitem(last=False)
+
+  def get(self, state: list[int], goal: list[int] = None) -> list[list[int]]:
+    """
+    Returns the cached optimal path from a state, counting a hit or a miss.
+
+    Args:
+    - state (list[int]): The start state.
+    - goal (list[int], optional): The goal state. Default is the identity permutation.
+
+    Returns:
+    - list[list[int]] or None: The path, or None if it is not cached or the state is cached as
+      unsolvable (see contains).
+    """
+
+    return self._fetch(state, goal)[1]
+
+  def _fetch(self, state: list[int], goal: list[int]) -> tuple[bool, list[list[int]]]:
+    """
+    Follows the next links from a state to the goal, counting a hit or a miss.
+
+    Args:
+    - state (list[int]): The start state.
+    - goal (list[int]): The goal state, or None for the identity permutation.
+
+    Returns:
+    - tuple[bool, list[list[int]]]: Whether the state was cached, and its path (None if unsolvable).
+    """
+
+    goalstr: str = state2str(goal if goal is not None else sorted(state))
+    entry = self._lookup(self._key(state2str(state), goalstr))
+    if entry is None:
+      self.misses += 1
+      return False, None
+    if entry[1] == self._unsolvable:
+      self.hits += 1
+      return True, None
+
+    path: list[list[int]] = [list(state)]
+    while entry[1]:
+      statestr = entry[0]
+      entry = self._lookup(self._key(statestr, goalstr))
+      if entry is None:
+        # A link was evicted; the rest of the chain is unusable
+        self.misses += 1
+        return False, None
+      path.append([tile_chars.index(char) for char in statestr])
+
+    self.hits += 1
+    return True, path
+
+  def contains(self, state: list[int], goal: list[int] = None) -> bool:
+    """
+    Checks whether a state has a cached result (a path or unsolvable), without counting.
+
+    Args:
+    - state (list[int]): The start state.
+    - goal (list[int], optional): The goal state. Default is the identity permutation.
+
+    Returns:
+    - bool: True if the state is cached.
+    """
+
+    goalstr: str = state2str(goal if goal is not None else sorted(state))
+    return self._lookup(self._key(state2str(state), goalstr)) is not None
+
+  def put(self, path: list[list[int]], goal: list[int] = None, state: list[int] = None) -> None:
+    """
+    Caches an optimal path and all of its suffixes.
+
+    Args:
+    - path (list[list[int]] or None): The path from a start state to the goal, or None if the
+      state is unsolvable (then state must be given).
+    - goal (list[int], optional): The goal state. Default is the last state of the path.
+    - state (list[int], optional): The start state, required only when path is None.
+    """
+
+    if path is None:
+      goalstr = state2str(goal if goal is not None else sorted(state))
+      rows = [(self._key(state2str(state), goalstr), '', self._unsolvable)]
+    else:
+      statestrs: list[str] = [state2str(s) for s in path]
+      goalstr = state2str(goal) if goal is not None else statestrs[-1]
+      last: int = len(statestrs) - 1
+      rows = [
+        (self._key(statestr, goalstr), statestrs[i + 1] if i < last else '', last - i)
+        for i, statestr in enumerate(statestrs)
+      ]
+
+    # Store from the goal backward so the start state ends up most recently used
+    for key, next_str, remaining in reversed(rows):
+      self._store(key, (next_str, remaining))
+    if self._db is not None:
+      self._db.executemany('INSERT OR REPLACE INTO solutions VALUES (?, ?, ?)', rows)
+      self._db.commit()
+
+  def solve(self, puzzle, solver: str = 'solve_astar', **options) -> list[list[int]]:
+    """
+    Returns the cached path for a puzzle's current state, or solves it and caches the result.
+
+    Args:
+    - puzzle (SlidingPuzzle): The puzzle to solve.
+    - solver (str, optional): The name of the solver method to fall back on. It must return
+      optimal paths. Default is solve_astar.
+    - options: Keyword arguments for the solver, e.g. heuristic.
+
+    Returns:
+    - list[list[int]] or None: A list of states representing the path from the current state to the goal state,
+      or None if no path is found.
+    """
+
+    cached, path = self._fetch(puzzle.state, puzzle.goal_state)
+    if cached:
+      return path
+
+    path = getattr(puzzle, solver)(**options)
+    self.put(path, puzzle.goal_state, puzzle.state)
+    return path
+
+  def close(self) -> None:
+    """
+    Closes the backing store, if there is one.
+    """
+
+    if self._db is not None:
+      self._db.close()
+      self._db = None
@@ -0,0 +1,223 @@
+"""Thin client for the solver server (see server.py)."""
+
+import json
+import os
+import socket
+import tempfile
+
+from utils import state2str, tile_chars
+
+# Where the server listens unless told otherwise
+default_address: str = os.path.join(tempfile.gettempdir(), 'visual_search.sock')
+
+def parse_address(text: str):
+  """
+  Parses a server address: 'host:port' or ':port' for TCP (host defaults to localhost), or
+  anything else as the path of a Unix socket.
+
+  Args:
+  - text (str): The address.
+
+  Returns:
+  - str or tuple[str, int]: A socket path, or a (host, port) pair.
+  """
+
+  host, sep, port = text.rpartition(':')
+  if sep and port.isdigit() and '/' not in text:
+    return host or 'localhost', int(port)
+  return text
+
+def format_request(state: list[int], solver: str = 'astar', heuristic: str = 'manhattan', goal: list[int] = None) -> str:
+  """
+  Formats a SOLVE request line. Options left at their defaults are omitted.
+
+  Args:
+  - state (list[int]): The state to solve.
+  - solver (str, optional): The solver name (a key of solve.solvers). Default is astar.
+  - heuristic (str, optional): The heuristic name. Default is manhattan.
+  - goal (list[int], optional): The goal state. Default is the identity permutation.
+
+  Returns:
+  - str: The request, without the newline.
+  """
+
+  words: list[str] = ['SOLVE', state2str(state)]
+  if solver != 'astar':
+    words.append(f'solver={solver}')
+  if heuristic != 'manhattan':
+    words.append(f'heuristic={heuristic}')
+  if goal is not None:
+    words.append(f'goal={state2str(goal)}')
+  return ' '.join(words)
+
+def parse_response(line: str) -> dict:
+  """
+  Parses a response to SOLVE into the result fields of solve.solve_state.
+
+  Args:
+  - line (str): The response, 'OK <expanded> <seconds> <state> ...', 'NONE <expanded> <seconds>'
+    or 'ERR <message>'.
+
+  Returns:
+  - dict: path (state strings, or None), length, expanded and time; or error.
+  """
+
+  kind, _, rest = line.rstrip('\n').partition(' ')
+  if kind == 'ERR':
+    return {'error': rest}
+  words: list[str] = rest.split()
+  if kind == 'OK':
+    path = words[2:]
+    return {'time': float(words[1]), 'path': path, 'length': len(path) - 1, 'expanded': int(words[0])}
+  if kind == 'NONE':
+    return {'time': float(words[1]), 'path': None, 'length': None, 'expanded': int(words[0])}
+  raise ConnectionError(f'unexpected response from the solver server: {line!r}')
+
+class SolverClient:
+  """
+  Blocking connection to a solver server.
+
+  Requests can be pipelined: solve_many keeps a window of requests in flight, so the server can
+  batch them onto its workers. Responses come back in request order.
+
+  Parameters:
+  - address (str or tuple[str, int], optional): A Unix socket path or (host, port). Default is default_address.
+  - timeout (float, optional): Seconds to wait for the connection and each response. Default is None (no limit).
+
+  Attributes:
+  - expanded (int): The nodes expanded by the server for the last solve.
+
+  Methods:
+  - solve(state, solver, heuristic, goal) -> list[list[int]]: Solves one state.
+  - solve_many(states, solver, heuristic, goal, window): Yields a result dict per state, in order.
+  - stats() -> dict: The server's throughput and latency figures.
+  - close(): Closes the connection.
+
+  Raises:
+  - OSError: If the server cannot be reached.
+  """
+
+  def __init__(self, address=None, timeout: float = None) -> None:
+    if address is None:
+      address = default_address
+    if isinstance(address, str):
+      self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+      self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    self._socket.settimeout(timeout)
+    try:
+      self._socket.connect(address)
+    except OSError:
+      self._socket.close()
+      raise
+    self._reader = self._socket.makefile('r', encoding='ascii', newline='\n')
+    # Set by solve to the nodes the server expanded
+    self.expanded: int = 0
+
+  def __enter__(self) -> 'SolverClient':
+    return self
+
+  def __exit__(self, *exc) -> None:
+    self.close()
+
+  def _send(self, lines: list[str]) -> None:
+    self._socket.sendall(''.join(line + '\n' for line in lines).encode('ascii'))
+
+  def _receive(self) -> str:
+    line: str = self._reader.readline()
+    if not line:
+      raise ConnectionError('the solver server closed the connection')
+    return line
+
+  def solve(self, state: list[int], solver: str = 'astar', heuristic: str = 'manhattan', goal: list[int] = None) -> list[list[int]]:
+    """
+    Solves one state on the server.
+
+    Args:
+    - state (list[int]): The state to solve.
+    - solver (str, optional): The solver name (a key of solve.solvers). Default is astar.
+    - heuristic (str, optional): The heuristic name. Default is manhattan.
+    - goal (list[int], optional): The goal state. Default is the identity permutation.
+
+    Returns:
+    - list[list[int]] or None: The path from the state to the goal, or None if there is none.
+
+    Raises:
+    - ValueError: If the server rejects the request.
+    """
+
+    self._send([format_request(state, solver, heuristic, goal)])
+    result: dict = parse_response(self._receive())
+    if 'error' in result:
+      raise ValueError(result['error'])
+    self.expanded = result['expanded']
+    if result['path'] is None:
+      return None
+    return [[tile_chars.index(char) for char in statestr] for statestr in result['path']]
+
+  def solve_many(self, states, solver: str = 'astar', heuristic: str = 'manhattan', goal: list[int] = None, window: int = 256):
+    """
+    Solves a stream of states, keeping up to window requests in flight.
+
+    Args:
+    - states (iterable[list[int]]): The states to solve.
+    - solver (str, optional): The solver name (a key of solve.solvers). Default is astar.
+    - heuristic (str, optional): The heuristic name. Default is manhattan.
+    - goal (list[int], optional): The goal state. Default is the identity permutation.
+    - window (int, optional): The most requests sent ahead of their responses. Default is 256.
+
+    Yields:
+    - dict: The parsed response for each state, in input order (see parse_response).
+    """
+
+    in_flight: int = 0
+    for state in states:
+      if in_flight == window:
+        yield parse_response(self._receive())
+        in_flight -= 1
+      self._send([format_request(state, solver, heuristic, goal)])
+      in_flight += 1
+    for _ in range(in_flight):
+      yield parse_response(self._receive())
+
+  def stats(self) -> dict:
+    """
+    Returns the server's statistics (see server.SolverServer.stats).
+
+    Returns:
+    - dict: The figures.
+    """
+
+    self._send(['STATS'])
+    kind, _, rest = self._receive().partition(' ')
+    if kind != 'STATS':
+      raise ConnectionError(f'unexpected response from the solver server: {kind}')
+    return json.loads(rest)
+
+  def close(self) -> None:
+    """
+    Closes the connection.
+    """
+
+    self._reader.close()
+    self._socket.close()
+
+def find_server(address=None):
+  """
+  Returns the address of a running solver server, or None if none answers there.
+
+  Args:
+  - address (str or tuple[str, int], optional): Where to look. Default is default_address.
+
+  Returns:
+  - str or tuple[str, int] or None: The address, or None.
+  """
+
+  if address is None:
+    address = default_address
+  try:
+    with SolverClient(address, timeout=0.5) as client:
+      client._send(['PING'])
+      return address if client._receive().strip() == 'PONG' else None
+  except OSError:
+    return None
@@ -1,6 +1,23 @@
 import pygame as pg
 
+from functools import lru_cache
+from math import isqrt
 from pygame.locals import *
+from utils import tile_chars
+
+@lru_cache(maxsize=None)
+def get_font(size: int) -> pg.font.Font:
+  """
+  Returns the shared default font at the given size, creating it on first use.
+
+  Args:
+  - size (int): The font size.
+
+  Returns:
+  - pg.font.Font: The font.
+  """
+
+  return pg.font.Font(None, size)
 
 class Tile:
   """
@@ -19,8 +36,12 @@ class Tile:
   - content_rect (pg.Rect): The rectangle representing the dimensions of the rendered content.
 
   Methods:
+  - cached(content, side_len, color) -> Tile: Returns the shared tile for these arguments.
   - __eq__(self, other): Equals comparison method. Used to compare tiles based on their content.
   """
+
+  # Tile atlas: one rendered tile per (content, side_len, color), shared by every TileGroup
+  _atlas: dict[tuple[str, int, str], 'Tile'] = {}
   
   def __init__(self, content: str, side_len=50, color='pink') -> None:
     """
@@ -41,7 +62,7 @@ class Tile:
     self.rect = pg.Rect((0, 0), (side_len, side_len))
     self.surface = pg.Surface(size=self.rect.size)
     font_size = 96
-    self.font = pg.font.Font(None, font_size)
+    self.font = get_font(font_size)
     self.content = self.font.render(content, True, 'black')
     # Centering font
     self.surface_rect = self.surface.get_rect()
@@ -51,6 +72,28 @@ class Tile:
     pg.draw.rect(self.surface, color, self.rect)
     self.surface.blit(self.content, self.content_rect)
 
+  @classmethod
+  def cached(cls, content: str, side_len=50, color='pink') -> 'Tile':
+    """
+    Returns the shared tile for the given arguments, rendering it only the first time.
+
+    Tiles are never modified after they are drawn, so one instance can be placed anywhere.
+
+    Args:
+    - content (str): The character content to be rendered on the tile.
+    - side_len (int, optional): The side length of the tile. Default is 50.
+    - color (str): The pygame color of the background of the Tile. Default is pink.
+
+    Returns:
+    - Tile: The cached tile.
+    """
+
+    key = (content, side_len, color)
+    tile = cls._atlas.get(key)
+    if tile is None:
+      tile = cls._atlas[key] = cls(content, side_len, color)
+    return tile
+
   def __eq__(self, other) -> bool:
     """
     Equals comparison method. Used to compare tiles based on their content.
@@ -68,21 +111,25 @@ class TileGroup:
   - padding (int, optional): The padding between tiles. Default is 0.
   - scale (int, optional): The scale factor for the entire tile group. Default is 1.
   - highlight (bool): Toggle for highlight mode, in which the blank tile is highlighted.
+  - side (int, optional): The side length of the board in tiles. Default is inferred from statestr.
   
   Attributes:
   - tile_pos (List[Tuple[int, int]]): List of base tile positions before adjustments.
+  - side (int): The side length of the board in tiles.
   - tile_len (int): The side length of each tile.
   - padding (int): The padding between tiles.
   - scale (int): The scale factor for the entire tile group.
   - statestr (str): The current state string.
   - tiles (List[Tile]): List of Tile objects created based on the state string.
+  - dirty (set[int]): Board indices whose tile changed since the last draw.
   
   Methods:
-  - draw(screen: pg.Surface): Draws the tile group on the specified Pygame surface.
+  - draw(screen: pg.Surface) -> list[pg.Rect]: Draws the changed tiles and returns the areas drawn.
   - update_statestr(statestr: str): Updates the state string and recreates the tiles accordingly.
+  - invalidate(): Marks every tile to be drawn again.
   """
   
-  def __init__(self, statestr: str, tile_len, padding: int = 0, scale: int = 1, highlight = False) -> None:
+  def __init__(self, statestr: str, tile_len, padding: int = 0, scale: int = 1, highlight = False, side: int = None) -> None:
     """
     Initializes a TileGroup with the specified parameters.
 
@@ -95,16 +142,14 @@ class TileGroup:
     - padding (int, optional): The padding between tiles. Default is 0.
     - scale (int, optional): The scale factor for the entire tile group. Default is 1.
     - highlight (bool): Toggle for highlight mode, in which the blank tile is highlighted.
+    - side (int, optional): The side length of the board in tiles. Default is inferred from statestr.
     """
 
     self.highlight = highlight
+    self.side = side if side is not None else isqrt(len(statestr))
 
-    # Base tile positions
-    tile_pos: list[tuple[int, int]] = [
-      (0, 0), (1, 0), (2, 0),
-      (0, 1), (1, 1), (2, 1),
-      (0, 2), (1, 2), (2, 2)
-    ]
+    # Base tile positions, row by row
+    tile_pos: list[tuple[int, int]] = [(x, y) for y in range(self.side) for x in range(self.side)]
     # Adjust for side length and padding
     tile_pos = [(x*(tile_len + padding), y*(tile_len + padding)) for x, y in tile_pos]
     self.tile_pos = [(x*scale, y*scale) for x, y in tile_pos]
@@ -115,21 +160,47 @@ class TileGroup:
     self.scale = scale
     self.statestr = statestr
 
-    # Creating tiles based on statestr
-    self.tiles: list[Tile] = [Tile(tile_num, tile_len) for tile_num in statestr]
-    index = self.statestr.index('0')
-    zero_color = 'pink' if highlight else 'orange'
-    self.tiles[index] = Tile(' ', self.tile_len, color=zero_color)
+    # Mapping cached tiles onto statestr
+    self.tiles: list[Tile] = self._map_tiles(statestr)
+    self.dirty: set[int] = set(range(len(self.tiles)))
+
+  @staticmethod
+  def _label(tile_chr: str) -> str:
+    """
+    Converts a state string character to the number shown on its tile.
+
+    Args:
+    - tile_chr (str): A character of the state string (see utils.tile_chars).
+
+    Returns:
+    - str: The tile number as text.
+    """
+
+    return str(tile_chars.index(tile_chr))
 
-  def draw(self, screen: pg.Surface) -> None:
+  def draw(self, screen: pg.Surface) -> list[pg.Rect]:
     """
-    Draws the tile group on the specified Pygame surface.
+    Draws the tiles that changed since the last draw on the specified Pygame surface.
 
     Args:
     - screen (pg.Surface): The Pygame surface on which to draw the tile group.
+
+    Returns:
+    - list[pg.Rect]: The areas of the surface that were drawn.
     """
 
-    screen.blits([(t.surface, pos) for t, pos in zip(self.tiles, self.tile_pos)])
+    if not self.dirty:
+      return []
+    rects = screen.blits([(self.tiles[index].surface, self.tile_pos[index]) for index in sorted(self.dirty)])
+    self.dirty.clear()
+    return rects
+
+  def invalidate(self) -> None:
+    """
+    Marks every tile to be drawn again, e.g. after the screen was cleared.
+    """
+
+    self.dirty.update(range(len(self.tiles)))
 
   def update_statestr(self, statestr: str) -> None:
     """
@@ -141,11 +212,27 @@ class TileGroup:
     
     if statestr != self.statestr:
       self.statestr = statestr
-      # Creating tiles based on new statestr
-      self.tiles: list[Tile] = [Tile(tile_chr, self.tile_len) for tile_chr in statestr]
-      index = self.statestr.index('0')
-      zero_color = 'pink' if self.highlight else 'orange'
-      self.tiles[index] = Tile(' ', self.tile_len, color=zero_color)
+      # Remapping cached tiles onto the new statestr
+      tiles: list[Tile] = self._map_tiles(statestr)
+      self.dirty.update(index for index, (old, new) in enumerate(zip(self.tiles, tiles)) if old is not new)
+      self.tiles = tiles
+
+  def _map_tiles(self, statestr: str) -> list[Tile]:
+    """
+    Picks the cached tile for every position of a state string.
+
+    Args:
+    - statestr (str): A string representing the state of the tiles.
+
+    Returns:
+    - list[Tile]: The tiles, in board order.
+    """
+
+    zero_color = 'pink' if self.highlight else 'orange'
+    return [
+      Tile.cached(self._label(tile_chr), self.tile_len) if tile_chr != '0' else Tile.cached(' ', self.tile_len, color=zero_color)
+      for tile_chr in statestr
+    ]
 
 class TextBox:
   """
@@ -162,17 +249,20 @@ class TextBox:
   - total_height (int): The total height needed for all lines in the text box.
   - text_surface (pg.Surface): Pygame surface containing the entire rendered text box.
   - rect (pg.Rect): Pygame rectangle representing the dimensions of the text surface.
+  - dirty (bool): True if the text box has not been drawn since it last changed.
 
   Methods:
   - __init__(self, path: str, line_len: int, font_size: int, text_color: str = 'black', back_color: str = 'white') -> None:
       Initializes a TextBox object by reading lines from a file and rendering them onto a Pygame surface. 
-  - draw(self, screen: pg.Surface) -> None:
-      Draws the text box onto the specified Pygame surface.
+  - draw(self, screen: pg.Surface) -> list[pg.Rect]:
+      Draws the text box onto the specified Pygame surface if it is dirty.
+  - invalidate(self) -> None:
+      Marks the text box to be drawn again.
   """
     
   def __init__(self, path: str, line_len: int, font_size: int, text_color: str = 'black', back_color: str = 'white') -> None:
     self.font_size: int = font_size
-    self.font: pg.font.Font = pg.font.Font(None, self.font_size)
+    self.font: pg.font.Font = get_font(self.font_size)
 
     # Read lines form file
     self.line_len: int = line_len
@@ -191,45 +281,86 @@ class TextBox:
       y_offset += line_surface.get_height()
 
     self.rect: pg.Rect = self.text_surface.get_rect()
+    self.dirty: bool = True
 
-  def draw(self, screen: pg.Surface) -> None:
+  def draw(self, screen: pg.Surface) -> list[pg.Rect]:
     """
-    Draws the text box onto the specified Pygame surface.
+    Draws the text box onto the specified Pygame surface if it has not been drawn yet.
     
     Parameters:
     - screen (pg.Surface): The Pygame surface on which to draw the text box.
   
     Returns:
-    - None
+    - list[pg.Rect]: The areas of the surface that were drawn.
     """
     
-    screen.blit(self.text_surface, self.rect)
+    if not self.dirty:
+      return []
+    self.dirty = False
+    return [screen.blit(self.text_surface, self.rect)]
+
+  def invalidate(self) -> None:
+    """
+    Marks the text box to be drawn again, e.g. after the screen was cleared.
+    """
+
+    self.dirty = True
 
 class Speedometer:
-  def __init__(self, speed: int, font_size: int, text_color: str = 'red', back_color: str = 'white') -> None:
+  def __init__(self, speed: int, font_size: int, text_color: str = 'red', back_color: str = 'white', screen_color: str = 'black') -> None:
     self.font_size: int = font_size
-    self.font = pg.font.Font(None, font_size)
+    self.font = get_font(font_size)
     self.text_color = text_color
     self.back_color = back_color
+    self.screen_color = screen_color
     self._update(speed, text_color, back_color)
     self.rect: pg.Rect = self.content.get_rect()
+    self._drawn: pg.Rect = None # Area covered by the last draw
+    self.dirty: bool = True
     
   def _update(self, speed: int, text_color: str = 'red', back_color: str = 'white') -> None:
     self.speed: int = speed
     self.content: pg.Surface = self.font.render('Speed: ' + str(round(1000/self.speed, 2)) + 'steps/sec.', True, text_color, back_color)
 
   def set_speed(self, speed: int) -> None:
-    self._update(speed, self.text_color, self.back_color)
+    """
+    Sets the speed, re-rendering the text only if it changed.
 
-  def draw(self, screen: pg.Surface) -> None:
+    Parameters:
+    - speed (int): The delay between steps in milliseconds.
+    """
+
+    if speed != self.speed:
+      self._update(speed, self.text_color, self.back_color)
+      self.rect.size = self.content.get_size()
+      self.dirty = True
+
+  def draw(self, screen: pg.Surface) -> list[pg.Rect]:
     """
-    Draws the text box onto the specified Pygame surface.
+    Draws the speedometer onto the specified Pygame surface if it changed since the last draw.
     
     Parameters:
     - screen (pg.Surface): The Pygame surface on which to draw the text box.
   
     Returns:
-    - None
+    - list[pg.Rect]: The areas of the surface that were drawn.
     """
     
-    screen.blit(self.content, self.rect)
\ No newline at end of file
+    if not self.dirty:
+      return []
+    self.dirty = False
+    rects: list[pg.Rect] = []
+    if self._drawn is not None:
+      # Clear the old text in case the new one is narrower
+      rects.append(screen.fill(self.screen_color, self._drawn))
+    self._drawn = screen.blit(self.content, self.rect)
+    rects.append(self._drawn)
+    return rects
+
+  def invalidate(self) -> None:
+    """
+    Marks the speedometer to be drawn again, e.g. after the screen was cleared.
+    """
+
+    self._drawn = None
+    self.dirty = True
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""Uniform random solvable instances, at any depth or at an exact optimal distance."""
+
+import argparse
+import random
+import sys
+import table
+import utils
+
+from array import array
+from utils import solvable, state2str, unrank
+
+_depth_ranks: dict[int, array] = None
+
+def random_state(side: int = utils.board_len, goal: list[int] = None, rng=None) -> list[int]:
+  """
+  Samples a state uniformly from those that can reach the goal.
+
+  A random permutation reaches the goal exactly when its parity matches. If it does not,
+  swapping the first two tiles flips the parity without moving the blank; the swap pairs every unsolvable permutation
+  with one solvable one, so the result stays uniform.
+
+  Args:
+  - side (int, optional): The side length of the board. Default is board_len.
+  - goal (list[int], optional): The goal state. Default is the identity permutation.
+  - rng (random.Random, optional): The source of randomness. Default is the random module.
+
+  Returns:
+  - list[int]: The state.
+  """
+
+  if rng is None:
+    rng = random
+  n: int = side * side
+  if goal is None:
+    goal = list(range(n))
+
+  state: list[int] = list(range(n))
+  rng.shuffle(state)
+  if not solvable(state, goal, side):
+    # The first two cells that do not hold the blank
+    i, j = (0, 1) if state[0] and state[1] else (1, 2) if state[1] else (0, 2)
+    state[i], state[j] = state[j], state[i]
+  return state
+
+def depth_ranks() -> dict[int, array]:
+  """
+  Groups the ranks of every solvable 8-puzzle state by optimal distance, building the index on
+  first use from the distance table.
+
+  Returns:
+  - dict[int, array]: The ranks at each distance, in increasing order.
+  """
+
+  global _depth_ranks
+  if _depth_ranks is None:
+    ranks: dict[int, array] = {}
+    # Slicing copies the table to bytes, which iterate as ints (an mmap iterates as 1-byte bytes)
+    for r, d in enumerate(table.distance_table()[:]):
+      if d != table.unreachable:
+        ranks.setdefault(d, array('I')).append(r)
+    _depth_ranks = ranks
+  return _depth_ranks
+
+def state_at_depth(depth: int, rng=None) -> list[int]:
+  """
+  Samples an 8-puzzle state uniformly from those exactly depth moves from the goal.
+
+  Only the 3x3 board has a distance table, so larger boards cannot be sampled by depth.
+
+  Args:
+  - depth (int): The optimal solution length, 0 to 31.
+  - rng (random.Random, optional): The source of randomness. Default is the random module.
+
+  Returns:
+  - list[int]: The state.
+
+  Raises:
+  - ValueError: If no state is at that distance.
+  """
+
+  if rng is None:
+    rng = random
+  ranks = depth_ranks().get(depth)
+  if not ranks:
+    raise ValueError(f'no 8-puzzle state is {depth} moves from the goal')
+  return unrank(ranks[rng.randrange(len(ranks))])
+
+def generate(count: int = None, side: int = utils.board_len, depth: int = None, seed: int = 0):
+  """
+  Yields reproducible random solvable instances.
+
+  The same seed always gives the same sequence, so a batch can be regenerated instead of stored.
+
+  Args:
+  - count (int, optional): The number of instances. Default is None (endless).
+  - side (int, optional): The side length of the board. Default is board_len.
+  - depth (int, optional): Sample only states at this optimal distance (3x3 only). Default is
+    None (uniform over all solvable states).
+  - seed (int, optional): The seed. Default is 0.
+
+  Yields:
+  - list[int]: The states.
+
+  Raises:
+  - ValueError: If a depth is given for a board other than 3x3.
+  """
+
+  if depth is not None and side != utils.board_len:
+    raise ValueError(f'no distance table for a {side}x{side} board')
+
+  rng = random.Random(seed)
+  produced: int = 0
+  while count is None or produced < count:
+    yield random_state(side, rng=rng) if depth is None else state_at_depth(depth, rng)
+    produced += 1
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Write random solvable states, one state string per line.')
+  parser.add_argument('-n', '--count', type=int, default=1000, help='number of states (default: 1000)')
+  parser.add_argument('--side', type=int, default=utils.board_len, help='board side length (default: 3)')
+  parser.add_argument('-d', '--depth', type=int, default=None, help='exact optimal distance (3x3 only)')
+  parser.add_argument('--seed', type=int, default=0)
+  args = parser.parse_args()
+
+  try:
+    states = generate(args.count, args.side, args.depth, args.seed)
+    sys.stdout.writelines(state2str(state) + '\n' for state in states)
+  except ValueError as error:
+    parser.error(str(error))
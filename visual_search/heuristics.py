@@ -0,0 +1,358 @@
+"""Admissible heuristics with incremental updates: Manhattan, linear conflict, walking distance and pattern databases."""
+
+import argparse
+import utils
+
+from collections import deque
+from functools import lru_cache
+
+class Manhattan:
+  """
+  Sum of the Manhattan distances of the tiles from their goal cells.
+
+  Every heuristic here has the same interface. evaluate scores a packed state from scratch and
+  also returns an aux value; update scores a child from its parent's value and aux in O(1),
+  given the tile that moved and the cells it moved between. Manhattan needs no aux and returns 0.
+
+  Parameters:
+  - side (int): The side length of the board.
+  - goal (tuple[int, ...]): The goal state.
+
+  Methods:
+  - evaluate(packed: int) -> tuple[int, int]: The value and aux of a packed state.
+  - update(h: int, aux: int, tile: int, src: int, dst: int) -> tuple[int, int]: The value and aux
+    after tile moves from src into the blank at dst.
+  """
+
+  name: str = 'manhattan'
+  # Whether the value changes by at most one per move; A* relies on this to never reopen a state
+  consistent: bool = True
+
+  def __init__(self, side: int, goal: tuple[int, ...]) -> None:
+    self.side: int = side
+    self.n: int = side * side
+    self.bits: int = utils.bits_for(self.n)
+    self.goal: tuple[int, ...] = goal
+    self.dist, self.delta = utils.manhattan_tables(side, goal)
+    # The goal index of each tile
+    self.where: list[int] = [0] * self.n
+    for index, tile in enumerate(goal):
+      self.where[tile] = index
+
+  def _cells(self, packed: int):
+    """
+    Yields (index, tile) for every cell of a packed state.
+    """
+
+    bits: int = self.bits
+    mask: int = (1 << bits) - 1
+    for index in range(self.n):
+      yield index, (packed >> (index * bits)) & mask
+
+  def evaluate(self, packed: int) -> tuple[int, int]:
+    dist = self.dist
+    return sum(dist[tile][index] for index, tile in self._cells(packed)), 0
+
+  def update(self, h: int, aux: int, tile: int, src: int, dst: int) -> tuple[int, int]:
+    return h + self.delta[tile][src][dst], aux
+
+class LinearConflict(Manhattan):
+  """
+  Manhattan distance plus two moves for every tile that must leave its goal row or column to let
+  another tile in the same line pass it.
+
+  Two tiles in their goal line but in reversed order conflict. Resolving a line takes two extra
+  moves per tile outside its longest increasing run of goal positions, so that count is tabled
+  for every possible line content. The aux value holds a base-(side + 1) key per row and column,
+  packed side by side; a move only changes the keys of the lines it touches, and only the two
+  lines across the move can change their conflicts.
+  """
+
+  name: str = 'linear'
+
+  def __init__(self, side: int, goal: tuple[int, ...]) -> None:
+    super().__init__(side, goal)
+    n, base, where = self.n, side + 1, self.where
+    self.conflicts: list[int] = _line_conflicts(side)
+    self.key_bits: int = (base ** side - 1).bit_length()
+    self.key_mask: int = (1 << self.key_bits) - 1
+
+    # contrib[tile][index]: the tile's share of the aux value, for its row and column keys
+    contrib: list[list[int]] = [[0] * n for _ in range(n)]
+    for tile in range(1, n):
+      goal_row, goal_col = divmod(where[tile], side)
+      for index in range(n):
+        row, col = divmod(index, side)
+        if row == goal_row:
+          contrib[tile][index] += (goal_col + 1) * base ** col << (row * self.key_bits)
+        if col == goal_col:
+          contrib[tile][index] += (goal_row + 1) * base ** row << ((side + col) * self.key_bits)
+    self.contrib: list[list[int]] = contrib
+
+    # The shifts of the two lines across each move: columns for a move along a row, and rows
+    # for a move along a column
+    self.across: dict[tuple[int, int], tuple[int, int]] = {}
+    for src in range(n):
+      for dst in utils.move_tables(side)[src]:
+        if src // side == dst // side:
+          lines = (side + src % side, side + dst % side)
+        else:
+          lines = (src // side, dst // side)
+        self.across[src, dst] = (lines[0] * self.key_bits, lines[1] * self.key_bits)
+
+  def evaluate(self, packed: int) -> tuple[int, int]:
+    dist, contrib = self.dist, self.contrib
+    h: int = 0
+    aux: int = 0
+    for index, tile in self._cells(packed):
+      h += dist[tile][index]
+      aux += contrib[tile][index]
+    conflicts, mask = self.conflicts, self.key_mask
+    for line in range(2 * self.side):
+      h += conflicts[(aux >> (line * self.key_bits)) & mask]
+    return h, aux
+
+  def update(self, h: int, aux: int, tile: int, src: int, dst: int) -> tuple[int, int]:
+    contrib = self.contrib[tile]
+    child: int = aux + contrib[dst] - contrib[src]
+    a, b = self.across[src, dst]
+    conflicts, mask = self.conflicts, self.key_mask
+    h += (
+      self.delta[tile][src][dst]
+      + conflicts[(child >> a) & mask] - conflicts[(aux >> a) & mask]
+      + conflicts[(child >> b) & mask] - conflicts[(aux >> b) & mask]
+    )
+    return h, child
+
+@lru_cache(maxsize=None)
+def _line_conflicts(side: int) -> list[int]:
+  """
+  Tables the linear conflict penalty of every line content.
+
+  A line key has one base-(side + 1) digit per cell: 0 for the blank or a tile whose goal is in
+  another line, otherwise 1 + the tile's goal position along the line.
+
+  Args:
+  - side (int): The side length of the board.
+
+  Returns:
+  - list[int]: The extra moves for each line key.
+  """
+
+  base: int = side + 1
+  penalties: list[int] = []
+  for key in range(base ** side):
+    goals: list[int] = []
+    while key:
+      key, digit = divmod(key, base)
+      if digit:
+        goals.append(digit)
+    # Longest strictly increasing run; the other tiles have to step out of the line and back
+    longest: list[int] = []
+    for i, value in enumerate(goals):
+      longest.append(1 + max((longest[j] for j in range(i) if goals[j] < value), default=0))
+    penalties.append(2 * (len(goals) - max(longest, default=0)))
+  return penalties
+
+class WalkingDistance(Manhattan):
+  """
+  Walking distance: the moves needed to sort the tiles into their goal rows, counting only which
+  row each tile is in, plus the same for columns.
+
+  Ignoring the order within a row, every vertical move takes one tile to the blank's row, so the
+  rows alone form a small abstract puzzle, solved exactly by breadth-first search into a table.
+  The aux value is the abstract row state and column state packed together; a vertical move
+  changes only the row state and a horizontal move only the column state, each by a fixed amount.
+
+  The 4x4 tables have 24,964 line states each; the 5x5 space is far too large to search in
+  Python, so WalkingDistance stops at 4x4.
+  """
+
+  name: str = 'wd'
+  max_side: int = 4
+
+  def __init__(self, side: int, goal: tuple[int, ...]) -> None:
+    if side > self.max_side:
+      raise ValueError(f'no walking distance tables for a {side}x{side} board')
+    super().__init__(side, goal)
+    n, where = self.n, self.where
+    # Each count takes a 3-bit field; the blank's line sits above the counts
+    self.count_bits: int = 3
+    self.blank_shift: int = side * side * self.count_bits
+    self.key_bits: int = self.blank_shift + self.count_bits
+    self.key_mask: int = (1 << self.key_bits) - 1
+
+    self.rows: dict[int, int] = _walking_table(side, tuple(where[tile] // side for tile in range(n)))
+    self.cols: dict[int, int] = _walking_table(side, tuple(where[tile] % side for tile in range(n)))
+
+    # step[tile][src][dst]: the change in aux when tile moves from src into the blank at dst
+    step: list[list[list[int]]] = [[[0] * n for _ in range(n)] for _ in range(n)]
+    for tile in range(1, n):
+      goal_row, goal_col = divmod(where[tile], side)
+      for src in range(n):
+        for dst in utils.move_tables(side)[src]:
+          if src // side != dst // side:
+            line, other, cls, shift = src // side, dst // side, goal_row, 0
+          else:
+            line, other, cls, shift = src % side, dst % side, goal_col, self.key_bits
+          change = self._field(other, cls) - self._field(line, cls) + ((line - other) << self.blank_shift)
+          step[tile][src][dst] = change << shift
+    self.step: list[list[list[int]]] = step
+
+  def _field(self, line: int, cls: int) -> int:
+    return 1 << ((line * self.side + cls) * self.count_bits)
+
+  def evaluate(self, packed: int) -> tuple[int, int]:
+    side, where = self.side, self.where
+    rows: int = 0
+    cols: int = 0
+    for index, tile in self._cells(packed):
+      row, col = divmod(index, side)
+      if tile:
+        rows += self._field(row, where[tile] // side)
+        cols += self._field(col, where[tile] % side)
+      else:
+        rows += row << self.blank_shift
+        cols += col << self.blank_shift
+    aux: int = rows | (cols << self.key_bits)
+    return self.rows[rows] + self.cols[cols], aux
+
+  def update(self, h: int, aux: int, tile: int, src: int, dst: int) -> tuple[int, int]:
+    child: int = aux + self.step[tile][src][dst]
+    return self.rows[child & self.key_mask] + self.cols[child >> self.key_bits], child
+
+@lru_cache(maxsize=None)
+def _walking_table(side: int, classes: tuple[int, ...]) -> dict[int, int]:
+  """
+  Runs breadth-first search over the abstract line states of walking distance.
+
+  A state counts, for every line, how many tiles of each goal line it holds, and records the
+  blank's line. A move takes one tile from a line next to the blank's into the blank's line.
+
+  Args:
+  - side (int): The side length of the board.
+  - classes (tuple[int, ...]): The goal line of each tile, by tile (the blank's entry gives its
+    goal line).
+
+  Returns:
+  - dict[int, int]: The exact abstract distance of every reachable line state, keyed as in
+    WalkingDistance.
+  """
+
+  count_bits: int = 3
+  blank_shift: int = side * side * count_bits
+
+  def field(line: int, cls: int) -> int:
+    return 1 << ((line * side + cls) * count_bits)
+
+  goal: int = classes[0] << blank_shift
+  for cls in classes[1:]:
+    goal += field(cls, cls)
+
+  distances: dict[int, int] = {goal: 0}
+  frontier: deque = deque([goal])
+  mask: int = (1 << count_bits) - 1
+  while frontier:
+    key = frontier.popleft()
+    d = distances[key] + 1
+    blank = key >> blank_shift
+    for other in (blank - 1, blank + 1):
+      if not 0 <= other < side:
+        continue
+      for cls in range(side):
+        if (key >> ((other * side + cls) * count_bits)) & mask:
+          child = key - field(other, cls) + field(blank, cls) + ((other - blank) << blank_shift)
+          if child not in distances:
+            distances[child] = d
+            frontier.append(child)
+  return distances
+
+def _pattern_database(side: int, goal: tuple[int, ...]):
+  # patterndb builds on this module, so it is imported on first use
+  from patterndb import PatternDatabase
+  return PatternDatabase(side, goal)
+
+# Heuristic name to its class (or a function building it)
+heuristics: dict = {
+  'manhattan': Manhattan,
+  'linear': LinearConflict,
+  'wd': WalkingDistance,
+  'pdb': _pattern_database
+}
+
+@lru_cache(maxsize=None)
+def get_heuristic(name: str, side: int, goal: tuple[int, ...] = None):
+  """
+  Returns a heuristic for a board and goal, building its tables on first use.
+
+  Args:
+  - name (str): A key of heuristics.
+  - side (int): The side length of the board.
+  - goal (tuple[int, ...], optional): The goal state. Default is the identity permutation.
+
+  Returns:
+  - Manhattan: The heuristic (Manhattan or a subclass).
+
+  Raises:
+  - ValueError: If the name is unknown, or the heuristic does not support the board.
+  """
+
+  if name not in heuristics:
+    raise ValueError(f'unknown heuristic {name}')
+  if goal is None:
+    goal = tuple(range(side * side))
+  return heuristics[name](side, goal)
+
+def verify(name: str) -> tuple[int, int, int]:
+  """
+  Checks a heuristic against the exact distance of every solvable 8-puzzle state.
+
+  Every state is scored from scratch and, for each move, incrementally; the two must agree, the
+  value must never exceed the true distance (admissible) and, unless the heuristic is marked
+  inconsistent, must change by at most one per move (consistent).
+
+  Args:
+  - name (str): A key of heuristics.
+
+  Returns:
+  - tuple[int, int, int]: The number of states checked, the sum of the heuristic, and the sum of
+    the exact distances.
+
+  Raises:
+  - AssertionError: On the first state that fails a check.
+  """
+
+  import table
+
+  heuristic = get_heuristic(name, utils.board_len)
+  distances = table.distance_table()
+  moves = utils.move_tables(utils.board_len)
+  checked, total, exact = 0, 0, 0
+  for r, d in enumerate(distances[:]):
+    if d == table.unreachable:
+      continue
+    state: list[int] = utils.unrank(r)
+    packed: int = utils.pack(state)
+    h, aux = heuristic.evaluate(packed)
+    assert h <= d, f'{name} overestimates {utils.state2str(state)}: {h} > {d}'
+    z_index: int = state.index(0)
+    for child, child_z, tile in utils.packed_neighbors(packed, z_index, moves):
+      child_h, child_aux = heuristic.update(h, aux, tile, child_z, z_index)
+      assert (child_h, child_aux) == heuristic.evaluate(child), f'{name} update is wrong after {utils.state2str(state)}'
+      assert not heuristic.consistent or abs(child_h - h) <= 1, f'{name} is inconsistent at {utils.state2str(state)}'
+    checked += 1
+    total += h
+    exact += d
+  return checked, total, exact
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Verify the heuristics against the exact 8-puzzle distances.')
+  parser.add_argument('names', nargs='*', help=f'heuristics to check, of {", ".join(sorted(heuristics))} (default: all)')
+  args = parser.parse_args()
+
+  for name in args.names or sorted(heuristics):
+    if name not in heuristics:
+      parser.error(f'unknown heuristic {name}')
+    checked, total, exact = verify(name)
+    kind = 'admissible and consistent' if get_heuristic(name, utils.board_len).consistent else 'admissible'
+    print(f'{name:>9}: {checked} states {kind}, mean {total / checked:.2f} of {exact / checked:.2f}')
@@ -0,0 +1,305 @@
+"""Hash-distributed A* (HDA*): one search spread over worker processes that each own a share of the states."""
+
+import heapq
+import heuristics
+import multiprocessing as mp
+import os
+import queue
+import time
+import utils
+
+from utils import pack, packed_neighbors
+
+# Seconds an idle worker waits for a message before checking again
+idle_timeout: float = 0.01
+# Seconds between the coordinator's termination checks
+poll_interval: float = 0.002
+
+_no_parent: int = -1
+_mask_64: int = (1 << 64) - 1
+
+def owner_of(packed: int, count: int) -> int:
+  """
+  Returns the worker that owns a state.
+
+  The state's hash is scrambled by a multiplicative (Fibonacci) hash before taking the
+  remainder, so that states spread evenly even when the worker count is a power of two.
+
+  Args:
+  - packed (int): The packed state.
+  - count (int): The number of workers.
+
+  Returns:
+  - int: The owner's index, 0 to count - 1.
+  """
+
+  return (((hash(packed) * 0x9E3779B97F4A7C15) & _mask_64) >> 32) % count
+
+def _worker(index: int, count: int, side: int, goal: tuple[int, ...], heuristic: str, batch_size: int,
+            inboxes: list, results: mp.Queue, incumbent, lock, sent, received, idle) -> None:
+  """
+  Runs one HDA* worker: expands the states it owns and sends each child to its owner.
+
+  The worker keeps the g and parent of every state it has been sent, and an open list of those
+  that may still lead to a solution cheaper than the incumbent. Children are queued per owner and
+  sent in batches after every batch_size expansions, and before the worker goes idle.
+
+  Messages in its inbox are ('nodes', [(state, z_index, g, h, aux, parent), ...]),
+  ('parent', state), answered on results with ('parent', state, parent), and ('stop',), answered
+  with ('done', index, expanded, generated, duplicates).
+
+  Args:
+  - index (int): This worker's index.
+  - count (int): The number of workers.
+  - side (int): The side length of the board.
+  - goal (tuple[int, ...]): The goal state.
+  - heuristic (str): The heuristic name, see heuristics.py.
+  - batch_size (int): The expansions between sends.
+  - inboxes (list[mp.Queue]): The inbox of every worker.
+  - results (mp.Queue): The queue to the coordinator.
+  - incumbent (mp.RawValue): The cost of the best solution found so far.
+  - lock (mp.Lock): Guards updates of the incumbent.
+  - sent (mp.RawArray): Batches sent, per sender; this worker writes only its own slot.
+  - received (mp.RawArray): Batches received, per receiver.
+  - idle (mp.RawArray): Set while the worker has nothing to expand.
+  """
+
+  n: int = side * side
+  bits: int = utils.bits_for(n)
+  moves = utils.move_tables(side)
+  model = heuristics.get_heuristic(heuristic, side, goal)
+  # Manhattan is updated inline; the other heuristics carry an aux value with each node
+  update = None if model.name == 'manhattan' else model.update
+  delta = model.delta
+  goal_packed: int = pack(list(goal), bits)
+  push, pop = heapq.heappush, heapq.heappop
+  inbox: mp.Queue = inboxes[index]
+
+  # Every state sent here to its (g, parent). A state reached again more cheaply is reopened,
+  # so an inconsistent heuristic still gives an optimal path.
+  seen: dict[int, tuple[int, int]] = {}
+  heap: list[tuple] = [] # (f, h, g, state, z_index, aux); stale entries are skipped when popped
+  outboxes: list[list[tuple]] = [[] for _ in range(count)]
+  expanded: int = 0
+  generated: int = 0
+  duplicates: int = 0
+
+  def flush() -> None:
+    for owner, batch in enumerate(outboxes):
+      if batch:
+        # Counted before it is sent, so a batch in flight always shows as sent but not received
+        sent[index] += 1
+        inboxes[owner].put(('nodes', batch))
+        outboxes[owner] = []
+
+  def handle(message: tuple) -> bool:
+    nonlocal duplicates
+    kind = message[0]
+    if kind == 'nodes':
+      idle[index] = 0
+      for state, z_index, g, h, aux, parent in message[1]:
+        old = seen.get(state)
+        if old is not None and old[0] <= g:
+          duplicates += 1
+          continue
+        seen[state] = (g, parent)
+        push(heap, (g + h, h, g, state, z_index, aux))
+      received[index] += 1
+    elif kind == 'parent':
+      results.put(('parent', message[1], seen[message[1]][1]))
+    elif kind == 'stop':
+      results.put(('done', index, expanded, generated, duplicates))
+      return False
+    return True
+
+  while True:
+    bound: int = incumbent.value
+    if heap and heap[0][0] < bound:
+      for _ in range(batch_size):
+        if not heap:
+          break
+        f, h, g, state, to_index, aux = pop(heap)
+        if f >= bound:
+          # The incumbent only falls, so nothing left here can improve on it
+          heap.clear()
+          break
+        record = seen[state]
+        if record[0] != g:
+          continue
+        if state == goal_packed:
+          with lock:
+            if g < incumbent.value:
+              incumbent.value = g
+          bound = incumbent.value
+          continue
+
+        expanded += 1
+        parent: int = record[1]
+        g += 1
+        for child, z_index, tile in packed_neighbors(state, to_index, moves, bits):
+          if child == parent:
+            continue
+          generated += 1
+          # The moved tile goes from the child's blank index to the parent's
+          if update is None:
+            child_h, child_aux = h + delta[tile][z_index][to_index], 0
+          else:
+            child_h, child_aux = update(h, aux, tile, z_index, to_index)
+          if g + child_h >= bound:
+            continue
+          owner: int = owner_of(child, count)
+          if owner != index:
+            outboxes[owner].append((child, z_index, g, child_h, child_aux, state))
+            continue
+          old = seen.get(child)
+          if old is not None and old[0] <= g:
+            duplicates += 1
+            continue
+          seen[child] = (g, state)
+          push(heap, (g + child_h, child_h, g, child, z_index, child_aux))
+      flush()
+
+      # Take whatever has arrived without waiting
+      while True:
+        try:
+          message = inbox.get_nowait()
+        except queue.Empty:
+          break
+        if not handle(message):
+          return
+    else:
+      heap.clear()
+      flush()
+      idle[index] = 1
+      try:
+        message = inbox.get(timeout=idle_timeout)
+      except queue.Empty:
+        continue
+      if not handle(message):
+        return
+
+def _quiescent(sent, received, idle) -> tuple[int, int, bool]:
+  """
+  Reads the counters once: batches sent and received in total, and whether every worker is idle.
+  """
+
+  return sum(sent), sum(received), all(idle)
+
+def _receive(results: mp.Queue, processes: list[mp.Process]) -> tuple:
+  """
+  Reads one reply from the workers, checking between waits that none has died, so a lost worker
+  raises instead of leaving the coordinator blocked forever.
+
+  Raises:
+  - RuntimeError: If a worker process died, or every worker has exited with nothing left to read.
+  """
+
+  while True:
+    try:
+      return results.get(timeout=idle_timeout)
+    except queue.Empty:
+      # A worker only exits cleanly after answering stop, and its reply is flushed before it exits
+      died = any(process.exitcode not in (None, 0) for process in processes)
+      if (died or all(process.exitcode is not None for process in processes)) and results.empty():
+        raise RuntimeError('an HDA* worker process died')
+
+def hda_star(state: list[int], side: int, goal: list[int], workers: int = None, heuristic: str = 'manhattan',
+             batch_size: int = 64) -> tuple[list[list[int]], tuple[int, int, int]]:
+  """
+  Solves a state with hash-distributed A*.
+
+  Each state belongs to one worker, picked by owner_of; the worker keeps its own open list and
+  closed records, and every child generated elsewhere is sent to it in batches over a
+  multiprocessing queue. A worker that reaches the goal lowers the shared incumbent, and every
+  worker then drops nodes with f at or above it.
+
+  The search ends when every worker is idle and every batch sent has been received, read twice in
+  a row with the same totals (the four-counter method), so no node with f below the incumbent
+  remains anywhere and the incumbent is optimal. The path is then rebuilt by asking each state's
+  owner for its parent.
+
+  Args:
+  - state (list[int]): The start state; it must be able to reach the goal.
+  - side (int): The side length of the board.
+  - goal (list[int]): The goal state.
+  - workers (int, optional): The number of worker processes. Default is the CPU count.
+  - heuristic (str, optional): The heuristic name, see heuristics.py. Default is manhattan.
+  - batch_size (int, optional): Expansions between sends in each worker. Default is 64.
+
+  Returns:
+  - tuple: The path from the start state to the goal (or None), and the total nodes expanded,
+    generated and pruned as duplicates.
+
+  Raises:
+  - RuntimeError: If a worker process dies.
+  """
+
+  if workers is None:
+    workers = os.cpu_count() or 1
+  n: int = side * side
+  bits: int = utils.bits_for(n)
+  goal = tuple(goal)
+  model = heuristics.get_heuristic(heuristic, side, goal)
+
+  inboxes: list[mp.Queue] = [mp.Queue() for _ in range(workers)]
+  results: mp.Queue = mp.Queue()
+  # No solution is longer than this; the incumbent is only read and lowered
+  incumbent = mp.RawValue('i', 1 << 30)
+  lock = mp.Lock()
+  # The last sent slot is the coordinator's, for the start state
+  sent = mp.RawArray('q', workers + 1)
+  received = mp.RawArray('q', workers)
+  idle = mp.RawArray('b', workers)
+
+  processes: list[mp.Process] = [
+    mp.Process(
+      target=_worker,
+      args=(index, workers, side, goal, heuristic, batch_size, inboxes, results, incumbent, lock, sent, received, idle),
+      daemon=True
+    )
+    for index in range(workers)
+  ]
+  for process in processes:
+    process.start()
+
+  try:
+    packed: int = pack(state, bits)
+    h, aux = model.evaluate(packed)
+    sent[workers] = 1
+    inboxes[owner_of(packed, workers)].put(('nodes', [(packed, state.index(0), 0, h, aux, _no_parent)]))
+
+    last: tuple[int, int, bool] = None
+    while True:
+      time.sleep(poll_interval)
+      if any(process.exitcode is not None for process in processes):
+        raise RuntimeError('an HDA* worker process died')
+      current = _quiescent(sent, received, idle)
+      if current[2] and current[0] == current[1] and current == last:
+        break
+      last = current
+
+    path: list[list[int]] = None
+    if incumbent.value < 1 << 30:
+      # Walk the parents back from the goal, asking each state's owner
+      packed_path: list[int] = [pack(list(goal), bits)]
+      while True:
+        inboxes[owner_of(packed_path[-1], workers)].put(('parent', packed_path[-1]))
+        _, _, parent = _receive(results, processes)
+        if parent == _no_parent:
+          break
+        packed_path.append(parent)
+      path = [utils.unpack(packed, n, bits) for packed in reversed(packed_path)]
+
+    for inbox in inboxes:
+      inbox.put(('stop',))
+    totals: list[int] = [0, 0, 0]
+    for _ in range(workers):
+      _, _, *counts = _receive(results, processes)
+      totals = [total + count for total, count in zip(totals, counts)]
+    for process in processes:
+      process.join()
+    return path, tuple(totals)
+  finally:
+    for process in processes:
+      if process.is_alive():
+        process.terminate()
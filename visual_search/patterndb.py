@@ -0,0 +1,337 @@
+"""Disjoint additive pattern databases, stored as nibble-packed files and loaded with mmap."""
+
+import argparse
+import os
+import random
+import sys
+import time
+import utils
+
+from collections import deque
+from heuristics import Manhattan
+
+# Where the pattern database files are kept
+pdb_dir: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdb')
+
+# Default partitions of the tiles, by side length. The 15-puzzle uses a 5-5-5 split; the 7-8 and
+# 6-6-3 splits of Korf and Felner need a search over 16 ** 8 or 16 ** 7 (placement, blank) pairs,
+# too many for a pure-Python build. Each 5-tile table takes about ten seconds to build and 512 KB.
+default_partitions: dict[int, tuple[tuple[int, ...], ...]] = {
+  3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+  4: ((1, 2, 3, 4, 5), (6, 7, 8, 9, 10), (11, 12, 13, 14, 15)),
+  5: ((1, 2, 5, 6), (3, 4, 8, 9), (7, 12, 13, 14), (10, 11, 15, 16), (17, 18, 22, 23), (19, 20, 21, 24))
+}
+
+# Stored values are capped at one nibble
+_max_excess: int = 15
+_unseen: int = 0xFF
+
+def table_size(side: int, pattern: tuple[int, ...]) -> int:
+  """
+  Returns the number of entries in a pattern table.
+
+  Entries are indexed by the cells of the pattern's tiles as digits in base n, so moving one
+  tile changes the index by a fixed amount. Index values where two tiles share a cell are never
+  used; this wastes space (about 2x for 5 tiles of 16) in exchange for O(1) updates.
+
+  Args:
+  - side (int): The side length of the board.
+  - pattern (tuple[int, ...]): The tiles of the pattern.
+
+  Returns:
+  - int: n ** len(pattern).
+  """
+
+  return (side * side) ** len(pattern)
+
+def pattern_path(side: int, pattern: tuple[int, ...], goal: tuple[int, ...] = None) -> str:
+  """
+  Returns the file of a pattern table.
+
+  Args:
+  - side (int): The side length of the board.
+  - pattern (tuple[int, ...]): The tiles of the pattern.
+  - goal (tuple[int, ...], optional): The goal state. Default is the identity permutation.
+
+  Returns:
+  - str: The path inside pdb_dir.
+  """
+
+  if goal is None:
+    goal = tuple(range(side * side))
+  return os.path.join(pdb_dir, f'{side}x{side}-{utils.state2str(goal)}-{utils.state2str(pattern)}.pdb')
+
+def build_pattern(side: int, pattern: tuple[int, ...], goal: tuple[int, ...] = None) -> bytearray:
+  """
+  Builds one additive pattern table by 0-1 breadth-first search backward from the goal.
+
+  The abstract state is the cells of the pattern's tiles plus the blank's cell. Moving the blank
+  into a cell of a tile outside the pattern is free; moving a pattern tile costs one. Only pattern
+  tiles are counted, so the tables of disjoint patterns can be added and stay admissible. The
+  stored value for a placement is its cheapest cost over all blank cells, which keeps the table
+  n times smaller but makes the heuristic inconsistent (see PatternDatabase).
+
+  That cost minus the pattern tiles' Manhattan distance is always even and non-negative; half of
+  it, capped at 15, is stored in a nibble. Capping only lowers the value, so it stays admissible.
+
+  Args:
+  - side (int): The side length of the board.
+  - pattern (tuple[int, ...]): The tiles of the pattern (not the blank).
+  - goal (tuple[int, ...], optional): The goal state. Default is the identity permutation.
+
+  Returns:
+  - bytearray: The nibble-packed table; entry i is in byte i // 2, low nibble first.
+  """
+
+  n: int = side * side
+  if goal is None:
+    goal = tuple(range(n))
+  moves = utils.move_tables(side)
+  k: int = len(pattern)
+  size: int = n ** k
+  weights: list[int] = [n ** i for i in range(k)]
+
+  # Cost of every (placement, blank) pair, coded as placement * n + blank, and of every placement
+  costs: bytearray = bytearray([_unseen]) * (size * n)
+  best: bytearray = bytearray([_unseen]) * size
+  start: int = sum(goal.index(tile) * weight for tile, weight in zip(pattern, weights))
+  code: int = start * n + goal.index(0)
+  costs[code] = 0
+  # Entries are cost * stride + code, so an entry superseded by a cheaper one can be skipped
+  stride: int = size * n
+  frontier: deque = deque([code])
+
+  while frontier:
+    cost, code = divmod(frontier.popleft(), stride)
+    if cost != costs[code]:
+      continue
+    index, blank = divmod(code, n)
+    if cost < best[index]:
+      best[index] = cost
+
+    owner: list[int] = [-1] * n
+    rest: int = index
+    for i in range(k):
+      rest, cell = divmod(rest, n)
+      owner[cell] = i
+
+    for target in moves[blank]:
+      i = owner[target]
+      if i < 0:
+        # The blank swaps with a tile outside the pattern: free
+        child, child_cost = index * n + target, cost
+      else:
+        # A pattern tile moves into the blank's cell
+        child, child_cost = (index + (blank - target) * weights[i]) * n + target, cost + 1
+      if child_cost < costs[child]:
+        costs[child] = child_cost
+        if child_cost == cost:
+          frontier.appendleft(child_cost * stride + child)
+        else:
+          frontier.append(child_cost * stride + child)
+
+  dist = utils.manhattan_tables(side, goal)[0]
+  table: bytearray = bytearray((size + 1) // 2)
+  for index in range(size):
+    cost = best[index]
+    if cost == _unseen:
+      continue
+    md: int = 0
+    rest = index
+    for tile in pattern:
+      rest, cell = divmod(rest, n)
+      md += dist[tile][cell]
+    excess = min((cost - md) // 2, _max_excess)
+    table[index >> 1] |= excess << ((index & 1) << 2)
+  return table
+
+def pattern_table(side: int, pattern: tuple[int, ...], goal: tuple[int, ...] = None, build: bool = True):
+  """
+  Loads a pattern table (see utils.cached_table), building and saving it first if the file is
+  missing or the wrong size. When the file cannot be written the table is kept in memory only.
+
+  Args:
+  - side (int): The side length of the board.
+  - pattern (tuple[int, ...]): The tiles of the pattern.
+  - goal (tuple[int, ...], optional): The goal state. Default is the identity permutation.
+  - build (bool, optional): Build a missing table; if False, a missing table raises. Default is True.
+
+  Returns:
+  - mmap.mmap or bytearray: The nibble-packed table.
+
+  Raises:
+  - FileNotFoundError: If the table is missing and build is False.
+  - ValueError: If the table is the wrong size and build is False.
+  """
+
+  path: str = pattern_path(side, pattern, goal)
+  length: int = (table_size(side, pattern) + 1) // 2
+  if not build:
+    try:
+      return utils.load_table(path, length)
+    except FileNotFoundError:
+      raise FileNotFoundError(f'{path} has not been built (run patterndb.py build)') from None
+  return utils.cached_table(path, length, lambda: build_pattern(side, pattern, goal))
+
+class PatternDatabase(Manhattan):
+  """
+  Additive pattern database heuristic: Manhattan distance plus, for each pattern, twice the
+  stored excess of its tiles' placement.
+
+  The partition must cover every tile, so the patterns' Manhattan parts sum to the full Manhattan
+  distance. The aux value holds one table index per pattern, packed side by side; a move changes
+  only the index of the moved tile's pattern, by a fixed amount.
+
+  The heuristic is admissible but not consistent: each table keeps the cheapest cost over blank
+  cells, and a move can carry the blank to a cell from which the pattern is much costlier. IDA*
+  needs nothing more; A* reopens closed states for it.
+
+  Parameters:
+  - side (int): The side length of the board.
+  - goal (tuple[int, ...]): The goal state.
+  - partition (tuple[tuple[int, ...], ...], optional): The patterns. Default is default_partitions[side].
+  - build (bool, optional): Build missing tables instead of raising. Default is True.
+  """
+
+  name: str = 'pdb'
+  consistent: bool = False
+
+  def __init__(self, side: int, goal: tuple[int, ...], partition: tuple[tuple[int, ...], ...] = None, build: bool = True) -> None:
+    super().__init__(side, goal)
+    if partition is None:
+      if side not in default_partitions:
+        raise ValueError(f'no default pattern partition for a {side}x{side} board')
+      partition = default_partitions[side]
+    if sorted(tile for pattern in partition for tile in pattern) != list(range(1, self.n)):
+      raise ValueError(f'partition {partition} does not cover tiles 1-{self.n - 1} exactly once')
+
+    n: int = self.n
+    self.partition: tuple[tuple[int, ...], ...] = partition
+    self.tables: list = [pattern_table(side, pattern, goal, build) for pattern in partition]
+    self.index_bits: int = max(table_size(side, pattern) - 1 for pattern in partition).bit_length()
+    self.index_mask: int = (1 << self.index_bits) - 1
+
+    # For each tile: its pattern, the pattern's shift in aux, and its weight in the index
+    self.owner: list[int] = [0] * n
+    self.shift: list[int] = [0] * n
+    self.weight: list[int] = [0] * n
+    for p, pattern in enumerate(partition):
+      for i, tile in enumerate(pattern):
+        self.owner[tile] = p
+        self.shift[tile] = p * self.index_bits
+        self.weight[tile] = n ** i
+
+  def _excess(self, p: int, index: int) -> int:
+    return (self.tables[p][index >> 1] >> ((index & 1) << 2)) & 0xF
+
+  def evaluate(self, packed: int) -> tuple[int, int]:
+    dist, shift, weight = self.dist, self.shift, self.weight
+    h: int = 0
+    aux: int = 0
+    for index, tile in self._cells(packed):
+      if tile:
+        h += dist[tile][index]
+        aux += index * weight[tile] << shift[tile]
+    mask: int = self.index_mask
+    for p in range(len(self.partition)):
+      h += 2 * self._excess(p, (aux >> (p * self.index_bits)) & mask)
+    return h, aux
+
+  def update(self, h: int, aux: int, tile: int, src: int, dst: int) -> tuple[int, int]:
+    shift: int = self.shift[tile]
+    child: int = aux + ((dst - src) * self.weight[tile] << shift)
+    p: int = self.owner[tile]
+    mask: int = self.index_mask
+    h += (
+      self.delta[tile][src][dst]
+      + 2 * (self._excess(p, (child >> shift) & mask) - self._excess(p, (aux >> shift) & mask))
+    )
+    return h, child
+
+def parse_partition(text: str) -> tuple[tuple[int, ...], ...]:
+  """
+  Parses a partition given as comma-separated tiles per pattern, patterns separated by '/'.
+
+  Args:
+  - text (str): For example '1,2,3,4/5,6,7,8'.
+
+  Returns:
+  - tuple[tuple[int, ...], ...]: The patterns.
+  """
+
+  return tuple(tuple(int(tile) for tile in pattern.split(',')) for pattern in text.split('/'))
+
+def verify_walks(side: int, partition: tuple[tuple[int, ...], ...] = None, walks: int = 20, length: int = 200, seed: int = 0) -> int:
+  """
+  Checks a pattern database on random walks from the goal, for boards too large to check against
+  exact distances: each incremental update must match a full evaluation, and the value must never
+  exceed the number of moves walked so far, an upper bound on the true distance.
+
+  Args:
+  - side (int): The side length of the board.
+  - partition (tuple[tuple[int, ...], ...], optional): The patterns. Default is default_partitions[side].
+  - walks (int, optional): The number of walks. Default is 20.
+  - length (int, optional): The moves per walk. Default is 200.
+  - seed (int, optional): The seed. Default is 0.
+
+  Returns:
+  - int: The number of moves checked.
+
+  Raises:
+  - AssertionError: On the first failed check.
+  """
+
+  n: int = side * side
+  bits: int = utils.bits_for(n)
+  goal: list[int] = list(range(n))
+  heuristic = PatternDatabase(side, tuple(goal), partition, build=False)
+  moves = utils.move_tables(side)
+  rng = random.Random(seed)
+
+  checked: int = 0
+  for _ in range(walks):
+    packed, z_index = utils.pack(goal, bits), 0
+    h, aux = heuristic.evaluate(packed)
+    assert h == 0, 'the goal does not score 0'
+    for steps in range(1, length + 1):
+      child, child_z, tile = rng.choice(utils.packed_neighbors(packed, z_index, moves, bits))
+      child_h, child_aux = heuristic.update(h, aux, tile, child_z, z_index)
+      state: str = utils.state2str(utils.unpack(child, n, bits))
+      assert (child_h, child_aux) == heuristic.evaluate(child), f'update is wrong at {state}'
+      assert child_h <= steps, f'overestimates {state}: {child_h} > {steps}'
+      packed, z_index, h, aux = child, child_z, child_h, child_aux
+      checked += 1
+  return checked
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Build and verify additive pattern databases.')
+  commands = parser.add_subparsers(dest='command', required=True)
+  for command, help_text in (('build', 'build the tables of a partition'), ('verify', 'check the tables of a partition')):
+    command_parser = commands.add_parser(command, help=help_text)
+    command_parser.add_argument('--side', type=int, default=4, help='board side length (default: 4)')
+    command_parser.add_argument('-p', '--partition', type=parse_partition, default=None, help="patterns, e.g. '1,2,3,4/5,6,7,8' (default: built in)")
+  args = parser.parse_args()
+
+  partition = args.partition or default_partitions.get(args.side)
+  if partition is None:
+    parser.error(f'no default partition for a {args.side}x{args.side} board')
+
+  if args.command == 'build':
+    for pattern in partition:
+      start = time.perf_counter()
+      table = build_pattern(args.side, pattern)
+      path = pattern_path(args.side, pattern)
+      utils.save_table(table, path)
+      print(f'wrote {path}: {len(table)} bytes in {time.perf_counter() - start:.1f} s')
+  else:
+    try:
+      if args.side == utils.board_len and args.partition is None:
+        # The 3x3 tables can be checked against every exact distance
+        import heuristics
+        checked, total, exact = heuristics.verify('pdb')
+        print(f'pdb: {checked} states admissible, mean {total / checked:.2f} of {exact / checked:.2f}')
+      else:
+        print(f'pdb: {verify_walks(args.side, partition)} moves admissible')
+    except (AssertionError, FileNotFoundError, ValueError) as error:
+      print(f'pdb: {error}', file=sys.stderr)
+      sys.exit(1)
@@ -1,75 +1,148 @@
 import heapq
+import heuristics
+import table
 import utils
 
+from math import isqrt
 from random import choice, seed
-from utils import Node
+from sys import maxsize
+from time import perf_counter
+from utils import Node, NodeArena, OpenList, SearchStats, pack, unpack, packed_neighbors, rank, solvable
 
-class EightPuzzle:
+# Solvers call their progress callback once per this many expansions
+progress_interval: int = 1024
+
+# Layout of the A* open list keys: f, then h, then the node handle
+_h_shift: int = 32
+_f_shift: int = 48
+_handle_mask: int = (1 << _h_shift) - 1
+
+class SearchCancelled(Exception):
+  """
+  Raised from a progress callback to stop a search early.
+  """
+
+class SlidingPuzzle:
   """
-  Represents the 8-puzzle game.
+  Represents a sliding puzzle on an N x N board (the 8-, 15- or 24-puzzle).
+
+  Move and heuristic tables are looked up from the side length, and are shared by every puzzle
+  of the same size.
 
   Attributes:
+  - side (int): The side length of the board.
+  - n (int): The number of cells on the board.
+  - bits (int): The field width of the packed state.
+  - moves (list[tuple[int, ...]]): For each blank index, the indices the blank can move to.
+  - dist (list[list[int]]): Manhattan distance of each tile from its goal cell, by tile and index.
+  - delta (list[list[list[int]]]): Change in Manhattan distance when a tile moves, by tile, source and destination.
   - goal_state (list[int]): The goal state of the puzzle.
-  - adj_masks (list[list[int]]): Masks representing the adjacency relationships between tiles.
   - state (list[int]): The current state of the puzzle.
+  - solvable (bool): Whether the current state can reach the goal state; solvers return None at once if not.
   - statestr (str): A string representation of the current state.
-  - adj_mask (list[int]): The adjacency mask for the blank space.
+  - packed (int): The current state packed into an integer, used internally by the solvers.
   - z_index (int): The index of the blank space.
+  - stats (SearchStats): Counters, timings and hooks of the last solve.
+  - nodes_expanded (int): The number of nodes expanded by the last solve (read from stats).
+  - nodes_generated (int): The number of child nodes generated by the last solve (read from stats).
 
   Methods:
   - set(self, state: str) -> list[int]: Converts a string state to a list of integers.
+  - set_goal(self, goal: list[int]): Changes the goal state.
   - move(self, tile: int): Moves the specified tile to the blank space.
   - is_solved(self) -> bool: Checks if the puzzle is in the solved state.
   - print_board(self): Prints the current state of the puzzle.
   - shuffle(self, k: int): Shuffles the puzzle to generate a random solvable configuration.
   - reset(self): Resets the puzzle to its initial state.
+  - solve_astar(self) -> list[list[int]]: Solves the puzzle with A* search.
+  - solve_parallel(self, workers: int) -> list[list[int]]: Solves the puzzle with A* spread over worker processes.
+  - solve_table(self) -> list[list[int]]: Solves the puzzle from the exact distance table.
+  - solve_idastar(self) -> list[list[int]]: Solves the puzzle with IDA* search in constant memory.
+  - solve_bidirectional(self, mm: bool) -> list[list[int]]: Solves the puzzle searching from both ends.
+  - solve_anytime(self, weight: float): Yields improving solutions, ending with an optimal one.
   """
 
-  goal_state: list[int] = [0, 1, 2, 3, 4, 5, 6, 7, 8]
-  _adj_masks: list[list[int]] = [
-    [0, 1, 0, 1, 0, 0, 0, 0, 0],
-    [1, 0, 1, 0, 1, 0, 0, 0, 0],
-    [0, 1, 0, 0, 0, 1, 0, 0, 0],
-    [1, 0, 0, 0, 1, 0, 1, 0, 0],
-    [0, 1, 0, 1, 0, 1, 0, 1, 0],
-    [0, 0, 1, 0, 1, 0, 0, 0, 1],
-    [0, 0, 0, 1, 0, 0, 0, 1, 0],
-    [0, 0, 0, 0, 1, 0, 1, 0, 1],
-    [0, 0, 0, 0, 0, 1, 0, 1, 0]
-  ]
-
-  def __init__(self, state: list[int]):
+  def __init__(self, state: list[int], side: int = None, goal: list[int] = None):
     """
-    Initializes the EightPuzzle instance with the given state.
+    Initializes the SlidingPuzzle instance with the given state.
 
     Args:
     - state (list[int]): The initial state of the puzzle.
+    - side (int, optional): The side length of the board. Default is inferred from the state.
+    - goal (list[int], optional): The goal state. Default is the identity permutation (blank first).
     """
-    
+
+    if side is None:
+      side = isqrt(len(state))
+    if side < 2:
+      raise ValueError(f'board side {side} is too small')
+
+    self.side: int = side
+    self.n: int = side * side
+    self.bits: int = utils.bits_for(self.n)
+    self.moves: list[tuple[int, ...]] = utils.move_tables(side)
+    self.stats: SearchStats = SearchStats()
+    self.state: list[int] = None
+    self.set_goal(goal if goal is not None else list(range(self.n)))
     self.set(state)
+
+  @property
+  def nodes_expanded(self) -> int:
+    return self.stats.expanded
+
+  @property
+  def nodes_generated(self) -> int:
+    return self.stats.generated
     
-  def set(self, state: list[int]):
+  def _validate(self, state: list[int]):
     """
-    Converts a string state to a list of integers.
+    Checks that a state is a permutation of 0 to n-1.
 
     Args:
     - state (list[int]): The representation of the state.
+
+    Raises:
+    - ValueError: If the state is not a list of the integers 0 to n-1.
     """
 
     if not isinstance(state, list):
       raise ValueError(f'given argument is not a list')
-    if len(state) != utils.num_tiles:
-      raise ValueError(f'state {state} does not have 9 digits')
+    if len(state) != self.n:
+      raise ValueError(f'state {state} does not have {self.n} digits')
     for val in state:
       if not isinstance(val, int):
         raise ValueError(f'given values in list are not type int')
-    if set(state) != set(range(utils.num_tiles)):
-      raise ValueError(f'state does not have integers 0-8')
-      
+    if set(state) != set(range(self.n)):
+      raise ValueError(f'state does not have integers 0-{self.n - 1}')
+
+  def set(self, state: list[int]):
+    """
+    Converts a string state to a list of integers.
+
+    Args:
+    - state (list[int]): The representation of the state.
+    """
+
+    self._validate(state)
     self.state = state
-    self.statestr = ''.join(str(i) for i in self.state)
+    self.statestr = utils.state2str(self.state)
+    self.packed = pack(self.state, self.bits)
     self.z_index = self.state.index(0)
-    self.adj_mask = self._adj_masks[self.z_index]
+    self.solvable = solvable(self.state, self.goal_state, self.side)
+
+  def set_goal(self, goal: list[int]):
+    """
+    Changes the goal state and switches to its heuristic tables, which are cached per goal.
+
+    Args:
+    - goal (list[int]): The new goal state.
+    """
+
+    self._validate(goal)
+    self.goal_state = list(goal)
+    self.dist, self.delta = utils.manhattan_tables(self.side, tuple(goal))
+    if self.state is not None:
+      self.solvable = solvable(self.state, self.goal_state, self.side)
 
   def move(self, tile: int):
     """
@@ -81,7 +154,7 @@ class EightPuzzle:
     
     # Get the index of the tile and check for adjacency
     t_index = self.state.index(tile)
-    if self.adj_mask[t_index]:
+    if t_index in self.moves[self.z_index]:
       state = self.state.copy()
       state[t_index], state[self.z_index] = state[self.z_index], state[t_index]
       self.set(state)
@@ -102,24 +175,26 @@ class EightPuzzle:
     Prints the current state of the puzzle.
     """
 
-    print(self.statestr[0:3])
-    print(self.statestr[3:6])
-    print(self.statestr[6:9])
+    for row in range(0, self.n, self.side):
+      print(self.statestr[row:row + self.side])
 
   def shuffle(self, k: int, set_seed: int = None):
     """
     Shuffles the puzzle to generate a random solvable configuration.
 
+    A random walk is not a uniform sample and costs k moves; generate.random_state samples
+    uniformly in O(n).
+
     Args:
     - k (int): The number of random moves to perform.
-    - seed (int): The seed for RNG.
+    - set_seed (int, optional): The seed for RNG. Default is None (do not reseed).
     """
     
-    if seed:
+    if set_seed is not None:
       seed(set_seed)
 
     for i in range(k):
-      options = [self.state[index] for index, value in enumerate(self.adj_mask) if value]
+      options = [self.state[index] for index in self.moves[self.z_index]]
       self.move(choice(options))
 
   def reset(self):
@@ -142,11 +217,10 @@ class EightPuzzle:
 
     # Get the index of the blank tile
     z_index: int = state.index(0)
-    adj_indices: list[int] = [i for i, val in enumerate(self._adj_masks[z_index]) if val]
 
     # Generate list of neighbor states
     neighbors: list[list[int]] = []
-    for index in adj_indices:
+    for index in self.moves[z_index]:
       copy = state.copy()
       copy[index], copy[z_index] = copy[z_index], copy[index]
       neighbors.append(copy)
@@ -156,6 +230,9 @@ class EightPuzzle:
     """
     Calculate the heuristic value (Manhattan distance) for the given state.
 
+    The blank is not counted, which keeps the estimate admissible. During search the value is
+    only computed in full for the start node; children update it from self.delta.
+
     Args:
     - state (list[int]): The current state represented as a list of integers.
 
@@ -163,56 +240,697 @@ class EightPuzzle:
     - int: The calculated heuristic value.
     """
 
-    distance: int = 0
-    for index, value in enumerate(state):
-      # Manhattan distance heuristic
-      x_i, y_i = index % 3, index // 3
-      x_v, y_v = value % 3, value // 3
-      distance += abs(x_i - x_v) + abs(y_i - y_v)
+    dist = self.dist
+    return sum(dist[value][index] for index, value in enumerate(state))
+
+  def _begin_stats(self, stats: SearchStats) -> SearchStats:
+    """
+    Starts the statistics of a new solve.
+
+    Args:
+    - stats (SearchStats or None): The caller's stats object, or None for plain counters.
+
+    Returns:
+    - SearchStats: The stats object the solve records into, also kept as self.stats.
+    """
+
+    self.stats = stats if stats is not None else SearchStats()
+    return self.stats
 
-    return distance
+  def _solution(self, path: list[list[int]]) -> list[list[int]]:
+    """
+    Passes a found path to the on_solution hook, if one is set.
+    """
 
-  def solve_astar(self) -> list[list[int]]:
+    if self.stats.on_solution is not None:
+      self.stats.on_solution(path)
+    return path
+
+  def solve_astar(self, progress=None, stats: SearchStats = None, compact: bool = False, heuristic: str = 'manhattan') -> list[list[int]]:
     """
     Solve the puzzle using the A* algorithm and return the path from the initial state to the goal state.
 
+    Nodes are kept in a NodeArena and the open list holds plain int keys, so a node costs a few
+    array slots rather than an object; the path is rebuilt by walking parent handles.
+
+    With a detailed SearchStats, time spent in the heuristic, neighbor generation and the open
+    list is measured; otherwise only the counters are kept. Statistics are left in self.stats.
+
+    Args:
+    - progress (callable, optional): Called as progress(nodes_expanded, f) every progress_interval
+      expansions, where f is the f-value being expanded. It may raise SearchCancelled to stop.
+    - stats (SearchStats, optional): Records counters, timings and hooks. Default is a new plain SearchStats.
+    - compact (bool, optional): Keep expanded states in utils.closed_set, a rank-indexed bitset where
+      one fits (3x3 and smaller). It needs a bit per state instead of a hash set entry, but ranking
+      every child makes the search several times slower in pure Python. Default is False.
+    - heuristic (str, optional): 'manhattan', 'linear' (Manhattan plus linear conflict), 'wd'
+      (walking distance) or 'pdb' (additive pattern databases), see heuristics.py. Default is manhattan.
+      An inconsistent heuristic (pdb) keeps the g of expanded states and reopens any reached more cheaply.
+
+    Returns:
+    - list[list[int]] or None: A list of states representing the path from the initial state to the goal state,
+      or None if no path is found.
+
+    Raises:
+    - ValueError: If compact is requested with an inconsistent heuristic.
+    """
+
+    stats = self._begin_stats(stats)
+    if not self.solvable:
+      return None
+
+    delta = self.delta
+    moves, bits, n = self.moves, self.bits, self.n
+    model = heuristics.get_heuristic(heuristic, self.side, tuple(self.goal_state))
+    # Manhattan is updated inline; the other heuristics keep an aux value per node
+    update = None if model.name == 'manhattan' else model.update
+    auxes: list[int] = []
+    add_aux = auxes.append
+    arena: NodeArena = NodeArena(n, bits)
+    states, parents, gs, hs, z_indices = arena.states, arena.parents, arena.g, arena.h, arena.z_index
+    # The columns are appended to directly in the inner loop; a method call per node costs more
+    add_state, add_parent, add_g, add_h, add_z = states.append, parents.append, gs.append, hs.append, z_indices.append
+    # Open list entries are single ints ordered like (f, h, handle); handles grow with insertion
+    # order, so ties are broken first-in first-out. Superseded entries are skipped when popped.
+    heap: list[int] = []
+    best: dict[int, int] = {} # Queued state to the handle of its cheapest node so far
+    reopen: bool = not model.consistent
+    if reopen and compact:
+      raise ValueError(f'the {heuristic} heuristic is inconsistent and needs the g of closed states')
+    # Expanded states, or expanded state to its g when states may be reopened
+    closed = {} if reopen else utils.closed_set(n, bits) if compact else set()
+
+    # Bound once so a detailed run can swap in timed versions
+    push, pop, neighbors_of, evaluate = heapq.heappush, heapq.heappop, packed_neighbors, model.evaluate
+    timed: bool = stats.detailed
+    instrumented: bool = stats.instrumented()
+    on_expand, on_generate = stats.on_expand, stats.on_generate
+    if timed:
+      push, pop = stats.timed(push, 'heap_time'), stats.timed(pop, 'heap_time')
+      neighbors_of = stats.timed(neighbors_of, 'neighbor_time')
+      evaluate = stats.timed(evaluate, 'heuristic_time')
+      if update is not None:
+        update = stats.timed(update, 'heuristic_time')
+
+    h, aux = evaluate(self.packed)
+    root: int = arena.add(self.packed, self.z_index, -1, 0, h)
+    add_aux(aux)
+    best[self.packed] = root
+    push(heap, (h << _f_shift) | (h << _h_shift) | root)
+    goal_packed: int = pack(self.goal_state, bits)
+    f_bounds: list[int] = stats.f_bounds
+    expanded: int = 0
+    generated: int = 0
+    duplicates: int = 0
+
+    while heap:
+      key: int = pop(heap)
+      handle: int = key & _handle_mask
+      state: int = states[handle]
+      if best.get(state) != handle:
+        continue
+      f: int = key >> _f_shift
+      if not f_bounds or f > f_bounds[-1]:
+        f_bounds.append(f)
+
+      if state == goal_packed:
+        stats.expanded, stats.generated, stats.duplicates = expanded, generated, duplicates
+        return self._solution([unpack(packed, n, bits) for packed in arena.path(handle)])
+
+      del best[state]
+      if reopen:
+        closed[state] = gs[handle]
+      else:
+        closed.add(state)
+      expanded += 1
+      if instrumented and on_expand is not None:
+        on_expand(arena.node(handle))
+      if progress is not None and expanded % progress_interval == 0:
+        stats.expanded = expanded
+        progress(expanded, f)
+
+      g: int = gs[handle] + 1
+      parent_h: int = hs[handle]
+      parent_aux: int = auxes[handle] if update is not None else 0
+      to_index: int = z_indices[handle]
+      for neighbor, z_index, tile in neighbors_of(state, to_index, moves, bits):
+        other = best.get(neighbor)
+        if other is not None:
+          if gs[other] <= g:
+            duplicates += 1
+            continue
+        elif neighbor in closed:
+          # With a consistent heuristic an expanded state is never reached more cheaply
+          if not reopen or closed[neighbor] <= g:
+            duplicates += 1
+            continue
+          del closed[neighbor]
+
+        # The moved tile goes from the child's blank index to the parent's
+        if update is not None:
+          h, aux = update(parent_h, parent_aux, tile, z_index, to_index)
+          add_aux(aux)
+        elif timed:
+          start = perf_counter()
+          h = parent_h + delta[tile][z_index][to_index]
+          stats.heuristic_time += perf_counter() - start
+        else:
+          h = parent_h + delta[tile][z_index][to_index]
+        child: int = len(parents)
+        add_state(neighbor)
+        add_parent(handle)
+        add_g(g)
+        add_h(h)
+        add_z(z_index)
+        best[neighbor] = child
+        push(heap, ((g + h) << _f_shift) | (h << _h_shift) | child)
+        generated += 1
+        if instrumented and on_generate is not None:
+          on_generate(arena.node(child))
+
+      if instrumented:
+        stats.peak_open = max(stats.peak_open, len(best))
+        stats.peak_closed = len(closed)
+
+    stats.expanded, stats.generated, stats.duplicates = expanded, generated, duplicates
+    return None # No path is found
+
+  def solve_parallel(self, workers: int = None, stats: SearchStats = None, heuristic: str = 'manhattan', batch_size: int = 64) -> list[list[int]]:
+    """
+    Solve the puzzle using hash-distributed A* (HDA*) over worker processes and return the path
+    from the initial state to the goal state.
+
+    Every state is owned by one worker, which keeps its own open list and closed records;
+    children are sent to their owners in batches. The path is optimal, like solve_astar's.
+    Starting the processes costs tens of milliseconds, so this only pays off on hard instances.
+    See parallel.py.
+
+    Args:
+    - workers (int, optional): The number of worker processes. Default is the CPU count.
+    - stats (SearchStats, optional): Records the node counts summed over the workers; hooks other
+      than on_solution are not called. Default is a new SearchStats.
+    - heuristic (str, optional): 'manhattan', 'linear', 'wd' or 'pdb', see heuristics.py. Default is manhattan.
+    - batch_size (int, optional): Expansions each worker makes between sends. Default is 64.
+
     Returns:
     - list[list[int]] or None: A list of states representing the path from the initial state to the goal state,
       or None if no path is found.
     """
 
-    open_set: list[Node] = []
-    closed_set: set[str] = set()
+    # Loaded on first use; only this solver needs the worker processes
+    from parallel import hda_star
 
-    start_node = Node(self.state)
-    goal_node = Node(self.goal_state)
+    stats = self._begin_stats(stats)
+    if not self.solvable:
+      return None
 
-    heapq.heappush(open_set, (start_node.f, start_node))
+    path, (stats.expanded, stats.generated, stats.duplicates) = hda_star(
+      self.state, self.side, self.goal_state, workers, heuristic, batch_size
+    )
+    return self._solution(path) if path is not None else None
+
+  def solve_table(self, stats: SearchStats = None) -> list[list[int]]:
+    """
+    Solve the puzzle by descending the exact distance table and return the path from the
+    initial state to the goal state.
+
+    Each step moves to a neighbor whose distance is one lower, so the path is optimal and is
+    found in O(depth) table lookups. The table is built on first use (see table.py). Only the
+    3x3 board with the default goal has a table.
+
+    Args:
+    - stats (SearchStats, optional): Records counters and the on_solution hook. Default is a new SearchStats.
+
+    Returns:
+    - list[list[int]] or None: A list of states representing the path from the initial state to the goal state,
+      or None if no path is found.
+
+    Raises:
+    - ValueError: If the board is not 3x3 or the goal is not the default one.
+    """
+
+    stats = self._begin_stats(stats)
+    if self.side != utils.board_len:
+      raise ValueError(f'no distance table for a {self.side}x{self.side} board')
+    if self.goal_state != list(range(self.n)):
+      raise ValueError(f'no distance table for the goal {utils.state2str(self.goal_state)}')
+
+    distances = table.distance_table()
+    state: list[int] = self.state.copy()
+    d: int = distances[rank(state)]
+    if d == table.unreachable:
+      return None
+    stats.expanded = stats.generated = d
+
+    packed, z_index = self.packed, self.z_index
+    path: list[list[int]] = [state]
+    while d:
+      d -= 1
+      for neighbor, n_index, _ in packed_neighbors(packed, z_index):
+        state = unpack(neighbor)
+        if distances[rank(state)] == d:
+          packed, z_index = neighbor, n_index
+          path.append(state)
+          break
+
+    return self._solution(path)
+
+  def solve_idastar(self, progress=None, stats: SearchStats = None, heuristic: str = 'manhattan') -> list[list[int]]:
+    """
+    Solve the puzzle using iterative-deepening A* and return the path from the initial state to the goal state.
+
+    Each iteration is a depth-first search bounded by f = g + h, run on a single board that is
+    modified and restored in place. Only the blank's trail is kept, so memory does not grow with
+    the number of nodes explored. Moving the blank straight back to where it came from is skipped.
+
+    Args:
+    - progress (callable, optional): Called as progress(nodes_expanded, bound) at the start of each
+      iteration and every progress_interval expansions, where bound is the current f-bound. It may
+      raise SearchCancelled to stop.
+    - stats (SearchStats, optional): Records counters, the bound of each iteration and hooks. There is
+      no open list, so peaks and timings are not recorded; nodes are only built for the hooks when
+      a hook is set. Default is a new SearchStats.
+    - heuristic (str, optional): 'manhattan', 'linear' (Manhattan plus linear conflict), 'wd'
+      (walking distance) or 'pdb' (additive pattern databases), see heuristics.py. Default is manhattan.
+
+    Returns:
+    - list[list[int]] or None: A list of states representing the path from the initial state to the goal state,
+      or None if no path is found.
+    """
+
+    stats = self._begin_stats(stats)
+    if not self.solvable:
+      return None
+
+    model = heuristics.get_heuristic(heuristic, self.side, tuple(self.goal_state))
+    # Manhattan is updated inline; the other heuristics carry an aux value down the recursion
+    update = None if model.name == 'manhattan' else model.update
+    board: list[int] = self.state.copy()
+    goal: list[int] = self.goal_state
+    delta = self.delta
+    moves = self.moves
+    trail: list[int] = [] # Blank indices after each move
+    found: int = -1
+    expanded: int = 0
+    generated: int = 0
+    bits: int = self.bits
+    on_expand, on_generate = stats.on_expand, stats.on_generate
+    instrumented: bool = on_expand is not None or on_generate is not None
+
+    def search(z_index: int, g: int, h: int, aux: int, bound: int, prev: int) -> int:
+      nonlocal expanded, generated
+      f = g + h
+      if f > bound:
+        return f
+      if h == 0 and board == goal:
+        return found
+
+      expanded += 1
+      if instrumented and on_expand is not None:
+        on_expand(Node(pack(board, bits), z_index, g=g, h=h))
+      if progress is not None and expanded % progress_interval == 0:
+        stats.expanded = expanded
+        progress(expanded, bound)
+      minimum = maxsize
+      for index in moves[z_index]:
+        if index == prev:
+          continue
+        generated += 1
+        # Slide the tile at index into the blank
+        tile = board[index]
+        board[z_index] = tile
+        board[index] = 0
+        trail.append(index)
+        if update is None:
+          child_h, child_aux = h + delta[tile][index][z_index], 0
+        else:
+          child_h, child_aux = update(h, aux, tile, index, z_index)
+        if instrumented and on_generate is not None:
+          on_generate(Node(pack(board, bits), index, g=g + 1, h=child_h))
+        t = search(index, g + 1, child_h, child_aux, bound, z_index)
+        if t == found:
+          return found
+        trail.pop()
+        board[index] = tile
+        board[z_index] = 0
+        if t < minimum:
+          minimum = t
+      return minimum
+
+    h, aux = model.evaluate(self.packed)
+    bound: int = h
+    while True:
+      stats.f_bounds.append(bound)
+      if progress is not None:
+        progress(expanded, bound)
+      t = search(self.z_index, 0, h, aux, bound, -1)
+      if t == found:
+        break
+      bound = t
+    stats.expanded, stats.generated = expanded, generated
+
+    # Replay the blank's trail to rebuild the states
+    state: list[int] = self.state.copy()
+    path: list[list[int]] = [state]
+    z_index: int = self.z_index
+    for index in trail:
+      state = state.copy()
+      state[z_index], state[index] = state[index], 0
+      z_index = index
+      path.append(state)
+    return self._solution(path)
+
+  def solve_bidirectional(self, mm: bool = False, stats: SearchStats = None) -> list[list[int]]:
+    """
+    Solve the puzzle by searching forward from the current state and backward from the goal state
+    at the same time, and return the path from the initial state to the goal state.
+
+    Args:
+    - mm (bool, optional): If False, run bidirectional breadth-first search. If True, run
+      the MM algorithm (meet in the middle), a bidirectional heuristic search that orders each side
+      by max(g + h, 2g) and is guaranteed to meet at the midpoint. Default is False.
+    - stats (SearchStats, optional): Records counters and the on_solution hook. Default is a new SearchStats.
+
+    Returns:
+    - list[list[int]] or None: A list of states representing the path from the initial state to the goal state,
+      or None if no path is found.
+    """
+
+    self._begin_stats(stats)
+    if not self.solvable:
+      return None
+
+    start: int = self.packed
+    goal: int = pack(self.goal_state, self.bits)
+    if start == goal:
+      return self._solution([self.state.copy()])
+
+    chains = self._search_mm(start, goal) if mm else self._search_bfs(start, goal)
+    if chains is None:
+      return None
+    forward, backward = chains
+
+    path: list[list[int]] = [unpack(state, self.n, self.bits) for state in reversed(forward)]
+    path.extend(unpack(state, self.n, self.bits) for state in backward[1:])
+    return self._solution(path)
+
+  def _search_bfs(self, start: int, goal: int) -> tuple[list[int], list[int]]:
+    """
+    Bidirectional breadth-first search. The side with the smaller frontier expands one full layer
+    at a time; once every layer up to depth d_f forward and d_b backward is done without meeting,
+    the first state seen from both sides lies on an optimal path.
+
+    Args:
+    - start (int): The packed start state.
+    - goal (int): The packed goal state.
+
+    Returns:
+    - tuple[list[int], list[int]] or None: The packed states from the meeting state back to the start,
+      and from the meeting state on to the goal.
+    """
+
+    moves, bits, stats = self.moves, self.bits, self.stats
+    parents: list[dict[int, int]] = [{start: None}, {goal: None}]
+    frontiers: list[list[tuple[int, int]]] = [[(start, self.z_index)], [(goal, self.goal_state.index(0))]]
+
+    while frontiers[0] and frontiers[1]:
+      side: int = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+      seen, other = parents[side], parents[1 - side]
+      layer: list[tuple[int, int]] = []
+      for state, z_index in frontiers[side]:
+        stats.expanded += 1
+        for neighbor, n_index, _ in packed_neighbors(state, z_index, moves, bits):
+          if neighbor in seen:
+            stats.duplicates += 1
+            continue
+          seen[neighbor] = state
+          stats.generated += 1
+          if neighbor in other:
+            return self._join(parents[0], parents[1], neighbor, neighbor)
+          layer.append((neighbor, n_index))
+      frontiers[side] = layer
+
+    return None
+
+  def _search_mm(self, start: int, goal: int) -> tuple[list[int], list[int]]:
+    """
+    MM bidirectional heuristic search. Each side runs A* with priority max(g + h, 2g), where the
+    forward side estimates the distance to the goal and the backward side the distance to the
+    start (both Manhattan). The side with the lower best priority expands next, and the search stops
+    once the best meeting cost U is no larger than that priority.
+
+    Args:
+    - start (int): The packed start state.
+    - goal (int): The packed goal state.
+
+    Returns:
+    - tuple[list[int], list[int]] or None: The packed states from the meeting state back to the start,
+      and from the meeting state on to the goal.
+    """
+
+    cells = utils.cell_distances(self.side)
+    moves, bits, stats = self.moves, self.bits, self.stats
+    # Target cell of every tile for each direction
+    targets: list[list[int]] = [
+      [self.goal_state.index(tile) for tile in range(self.n)],
+      [self.state.index(tile) for tile in range(self.n)]
+    ]
+    starts: list[tuple[int, int, list[int]]] = [
+      (start, self.z_index, self.state),
+      (goal, self.goal_state.index(0), self.goal_state)
+    ]
+
+    opens: list[OpenList] = []
+    closed: list[dict[int, Node]] = [{}, {}]
+    for (state, z_index, board), target in zip(starts, targets):
+      h = sum(cells[index][target[value]] for index, value in enumerate(board) if value)
+      open_set = OpenList()
+      open_set.push(Node(state, z_index, h=h))
+      opens.append(open_set)
+
+    best: int = maxsize
+    meeting: tuple[Node, Node] = None
+
+    while opens[0] and opens[1]:
+      tops: list[Node] = [opens[0].peek(), opens[1].peek()]
+      side: int = 0 if tops[0].f <= tops[1].f else 1
+      if best <= tops[side].f:
+        break
+
+      open_set, other_open = opens[side], opens[1 - side]
+      seen, other_seen = closed[side], closed[1 - side]
+      target: list[int] = targets[side]
+
+      node: Node = open_set.pop()
+      seen[node.state] = node
+      stats.expanded += 1
+      g = node.g + 1
+      for neighbor, z_index, tile in packed_neighbors(node.state, node.z_index, moves, bits):
+        expanded = seen.get(neighbor)
+        if expanded is not None and expanded.g <= g:
+          stats.duplicates += 1
+          continue
+
+        target_index = target[tile]
+        h = node.h + cells[node.z_index][target_index] - cells[z_index][target_index]
+        child = Node(neighbor, z_index, node, g, h)
+        child.f = max(child.f, 2 * g)
+        if not open_set.push(child):
+          stats.duplicates += 1
+          continue
+        stats.generated += 1
+        if expanded is not None:
+          del seen[neighbor]
+
+        match = other_open.get(neighbor) or other_seen.get(neighbor)
+        if match is not None and g + match.g < best:
+          best = g + match.g
+          meeting = (child, match) if side == 0 else (match, child)
+
+    if meeting is None:
+      return None
+
+    forward, backward = [], []
+    for node, chain in zip(meeting, (forward, backward)):
+      while node:
+        chain.append(node.state)
+        node = node.parent
+    return forward, backward
+
+  def solve_anytime(self, weight: float = 2.0, progress=None, stats: SearchStats = None, heuristic: str = 'manhattan'):
+    """
+    Solve the puzzle with anytime weighted A*, yielding each better path as it is found.
+
+    The open list is ordered by g + weight * h, so a first solution costing at most weight times
+    the optimum comes quickly. The search then keeps going, pruning every node whose unweighted
+    g + h cannot beat the best path so far, and yields each improvement. When the open list runs
+    out the last path yielded is optimal.
+
+    Args:
+    - weight (float, optional): The heuristic weight; 1 gives plain A*. Default is 2.0.
+    - progress (callable, optional): Called as progress(nodes_expanded, f) every progress_interval
+      expansions, where f is the unweighted f-value being expanded. It may raise SearchCancelled to stop.
+    - stats (SearchStats, optional): Records counters, peaks and hooks; on_solution is called for
+      every improvement. Default is a new SearchStats.
+    - heuristic (str, optional): 'manhattan', 'linear' (Manhattan plus linear conflict), 'wd'
+      (walking distance) or 'pdb' (additive pattern databases), see heuristics.py. Default is manhattan.
+
+    Yields:
+    - list[list[int]]: Paths from the initial state to the goal state, each shorter than the last.
+    """
+
+    stats = self._begin_stats(stats)
+    if not self.solvable:
+      return
+
+    model = heuristics.get_heuristic(heuristic, self.side, tuple(self.goal_state))
+    update = None if model.name == 'manhattan' else model.update
+    open_set: OpenList = OpenList()
+    closed_set: dict[int, int] = {} # State to the g it was expanded with
+    delta = self.delta
+    moves, bits, n = self.moves, self.bits, self.n
+    goal_packed: int = pack(self.goal_state, bits)
+    best: int = maxsize
+    expanded: int = 0
+    generated: int = 0
+    duplicates: int = 0
+    instrumented: bool = stats.instrumented()
+    on_expand, on_generate = stats.on_expand, stats.on_generate
+
+    h, aux = model.evaluate(self.packed)
+    start_node = Node(self.packed, self.z_index, h=h, aux=aux)
+    start_node.f = weight * start_node.h
+    open_set.push(start_node)
 
     while open_set:
-      current_node: Node = heapq.heappop(open_set)[1]
+      current_node: Node = open_set.pop()
+      if current_node.g + current_node.h >= best:
+        continue
 
-      if current_node.state == goal_node.state:
+      if current_node.state == goal_packed:
+        best = current_node.g
+        stats.expanded, stats.generated, stats.duplicates = expanded, generated, duplicates
         path = []
-        while current_node:
-          path.append(current_node.state)
-          current_node = current_node.parent
-        
-        return path[::-1]
-      
-      closed_set.add(current_node.statestr)
-
-      for neighbor in self._get_neighbors(current_node.state):
-        if ''.join(str(i) for i in neighbor) in closed_set:
+        node = current_node
+        while node:
+          path.append(unpack(node.state, n, bits))
+          node = node.parent
+        yield self._solution(path[::-1])
+        continue
+
+      closed_set[current_node.state] = current_node.g
+      expanded += 1
+      if instrumented:
+        if on_expand is not None:
+          on_expand(current_node)
+        stats.peak_open = max(stats.peak_open, len(open_set))
+        stats.peak_closed = max(stats.peak_closed, len(closed_set))
+      if progress is not None and expanded % progress_interval == 0:
+        stats.expanded = expanded
+        progress(expanded, current_node.g + current_node.h)
+
+      g = current_node.g + 1
+      to_index = current_node.z_index
+      for neighbor, z_index, tile in packed_neighbors(current_node.state, to_index, moves, bits):
+        if update is None:
+          h, aux = current_node.h + delta[tile][z_index][to_index], 0
+        else:
+          h, aux = update(current_node.h, current_node.aux, tile, z_index, to_index)
+        if g + h >= best:
           continue
+        closed_g = closed_set.get(neighbor)
+        if closed_g is not None:
+          if closed_g <= g:
+            duplicates += 1
+            continue
+          # A cheaper path to an expanded state: reopen it
+          del closed_set[neighbor]
+
+        child = Node(neighbor, z_index, current_node, g, h, aux)
+        child.f = g + weight * h
+        if not open_set.push(child):
+          duplicates += 1
+        generated += 1
+        if instrumented and on_generate is not None:
+          on_generate(child)
+
+    stats.expanded, stats.generated, stats.duplicates = expanded, generated, duplicates
+
+  @staticmethod
+  def _join(forward_parents: dict[int, int], backward_parents: dict[int, int], forward: int, backward: int) -> tuple[list[int], list[int]]:
+    """
+    Follows the parent links of a bidirectional search out from the meeting point.
+
+    Args:
+    - forward_parents (dict[int, int]): Parent links of the forward search.
+    - backward_parents (dict[int, int]): Parent links of the backward search.
+    - forward (int): The meeting state on the forward side.
+    - backward (int): The meeting state on the backward side.
+
+    Returns:
+    - tuple[list[int], list[int]]: The packed states from the meeting state back to the start, and
+      from the meeting state on to the goal.
+    """
+
+    chains: list[list[int]] = []
+    for parents, state in ((forward_parents, forward), (backward_parents, backward)):
+      chain: list[int] = []
+      while state is not None:
+        chain.append(state)
+        state = parents[state]
+      chains.append(chain)
+    return chains[0], chains[1]
+
+class EightPuzzle(SlidingPuzzle):
+  """
+  Represents the 8-puzzle game (3x3 board).
+  """
+
+  goal_state: list[int] = [0, 1, 2, 3, 4, 5, 6, 7, 8]
+
+  def __init__(self, state: list[int], goal: list[int] = None):
+    """
+    Initializes the EightPuzzle instance with the given state.
+
+    Args:
+    - state (list[int]): The initial state of the puzzle.
+    - goal (list[int], optional): The goal state. Default is the identity permutation.
+    """
 
-        g = current_node.g + 1
-        h = self.heuristic(neighbor)
-        f = g + h
+    super().__init__(state, 3, goal)
 
-        new_node = Node(neighbor, current_node)
+class FifteenPuzzle(SlidingPuzzle):
+  """
+  Represents the 15-puzzle game (4x4 board).
+  """
+
+  goal_state: list[int] = list(range(16))
+
+  def __init__(self, state: list[int], goal: list[int] = None):
+    """
+    Initializes the FifteenPuzzle instance with the given state.
+
+    Args:
+    - state (list[int]): The initial state of the puzzle.
+    - goal (list[int], optional): The goal state. Default is the identity permutation.
+    """
+
+    super().__init__(state, 4, goal)
 
-        if (f, new_node) not in open_set:
-          heapq.heappush(open_set, (f, new_node))
+class TwentyFourPuzzle(SlidingPuzzle):
+  """
+  Represents the 24-puzzle game (5x5 board).
+  """
+
+  goal_state: list[int] = list(range(25))
+
+  def __init__(self, state: list[int], goal: list[int] = None):
+    """
+    Initializes the TwentyFourPuzzle instance with the given state.
+
+    Args:
+    - state (list[int]): The initial state of the puzzle.
+    - goal (list[int], optional): The goal state. Default is the identity permutation.
+    """
 
-    return None # No path is found
\ No newline at end of file
+    super().__init__(state, 5, goal)
\ No newline at end of file
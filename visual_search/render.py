@@ -0,0 +1,259 @@
+"""Headless rendering of solution paths to image sequences or animated PNGs."""
+
+import os
+
+# No window is opened; pygame draws to off-screen surfaces only
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import json
+import struct
+import sys
+import zlib
+
+import pygame as pg
+
+from collections import deque
+from components import TileGroup
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from puzzle import SlidingPuzzle
+from solve import parse_state
+from utils import state2str, tile_chars
+
+class APNGWriter:
+  """
+  Streams frames into an animated PNG file, one frame at a time.
+
+  Each frame is compressed and written as soon as it is added, so memory use does not grow
+  with the number of frames.
+
+  Parameters:
+  - path (str): The output file.
+  - size (tuple[int, int]): The frame width and height.
+  - num_frames (int): The number of frames that will be written.
+  - delay (int, optional): The time each frame is shown, in milliseconds. Default is 500.
+
+  Methods:
+  - add(surface: pg.Surface): Writes one frame.
+  - close(): Finishes the file.
+  """
+
+  _signature: bytes = b'\x89PNG\r\n\x1a\n'
+
+  def __init__(self, path: str, size: tuple[int, int], num_frames: int, delay: int = 500) -> None:
+    self.size: tuple[int, int] = size
+    self.num_frames: int = num_frames
+    self.delay: int = delay
+    self._frame: int = 0
+    self._sequence: int = 0
+    self._file = open(path, 'wb')
+    self._file.write(self._signature)
+    width, height = size
+    # 8-bit RGB, no interlacing
+    self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+    # Frame count, loop forever
+    self._chunk(b'acTL', struct.pack('>II', num_frames, 0))
+
+  def __enter__(self) -> 'APNGWriter':
+    return self
+
+  def __exit__(self, *exc) -> None:
+    self.close()
+
+  def _chunk(self, kind: bytes, data: bytes) -> None:
+    self._file.write(struct.pack('>I', len(data)))
+    self._file.write(kind)
+    self._file.write(data)
+    self._file.write(struct.pack('>I', zlib.crc32(kind + data)))
+
+  def _next_sequence(self) -> bytes:
+    sequence = struct.pack('>I', self._sequence)
+    self._sequence += 1
+    return sequence
+
+  def add(self, surface: pg.Surface) -> None:
+    """
+    Compresses and writes one frame.
+
+    Args:
+    - surface (pg.Surface): The frame, the same size as the animation.
+
+    Raises:
+    - ValueError: If all frames have already been written or the surface has the wrong size.
+    """
+
+    if self._frame >= self.num_frames:
+      raise ValueError(f'all {self.num_frames} frames have been written')
+    if surface.get_size() != self.size:
+      raise ValueError(f'frame size {surface.get_size()} does not match {self.size}')
+
+    width, height = self.size
+    pixels: bytes = pg.image.tobytes(surface, 'RGB')
+    stride: int = width * 3
+    # Each scanline starts with filter type 0 (none)
+    raw = b''.join(b'\x00' + pixels[row:row + stride] for row in range(0, stride * height, stride))
+    data = zlib.compress(raw)
+
+    self._chunk(b'fcTL', self._next_sequence() + struct.pack('>IIIIHHBB', width, height, 0, 0, self.delay, 1000, 0, 0))
+    if self._frame == 0:
+      self._chunk(b'IDAT', data)
+    else:
+      self._chunk(b'fdAT', self._next_sequence() + data)
+    self._frame += 1
+
+  def close(self) -> None:
+    """
+    Writes the end of the file and closes it.
+    """
+
+    if not self._file.closed:
+      self._chunk(b'IEND', b'')
+      self._file.close()
+
+def frames(path: list[list[int]], tile_len: int = 100, padding: int = 5):
+  """
+  Draws each state of a path with TileGroup on one reused off-screen surface.
+
+  Args:
+  - path (list[list[int]]): The states to draw.
+  - tile_len (int, optional): The side length of each tile. Default is 100.
+  - padding (int, optional): The padding between tiles. Default is 5.
+
+  Yields:
+  - pg.Surface: The surface after drawing each state; it is overwritten by the next frame.
+  """
+
+  statestrs: list[str] = [state2str(state) for state in path]
+  tilegroup = TileGroup(statestrs[0], tile_len=tile_len, padding=padding)
+  span: int = tilegroup.side * (tile_len + padding) - padding
+  surface = pg.Surface((span, span))
+  surface.fill('black')
+  for statestr in statestrs:
+    tilegroup.update_statestr(statestr)
+    tilegroup.draw(surface)
+    yield surface
+
+def render_path(path: list[list[int]], out: str, fmt: str = 'apng', delay: int = 500, tile_len: int = 100, padding: int = 5) -> str:
+  """
+  Renders a solution path to an animated PNG or a numbered PNG sequence.
+
+  Args:
+  - path (list[list[int]]): The states to draw.
+  - out (str): The output file for apng, or the output directory for png.
+  - fmt (str, optional): 'apng' or 'png'. Default is apng.
+  - delay (int, optional): The time each frame is shown, in milliseconds. Default is 500.
+  - tile_len (int, optional): The side length of each tile. Default is 100.
+  - padding (int, optional): The padding between tiles. Default is 5.
+
+  Returns:
+  - str: The file or directory written.
+
+  Raises:
+  - ValueError: If the format is unknown.
+  """
+
+  if fmt == 'png':
+    os.makedirs(out, exist_ok=True)
+    for index, surface in enumerate(frames(path, tile_len, padding)):
+      pg.image.save(surface, os.path.join(out, f'frame_{index:04d}.png'))
+    return out
+
+  if fmt == 'apng':
+    writer = None
+    try:
+      for surface in frames(path, tile_len, padding):
+        if writer is None:
+          writer = APNGWriter(out, surface.get_size(), len(path), delay)
+        writer.add(surface)
+    finally:
+      if writer is not None:
+        writer.close()
+    return out
+
+  raise ValueError(f'unknown format {fmt}')
+
+def _init_worker() -> None:
+  """
+  Starts pygame in a worker process (fonts are needed to draw tiles).
+  """
+
+  pg.init()
+
+def render_line(index: int, line: str, out_dir: str, fmt: str, delay: int, tile_len: int) -> dict:
+  """
+  Renders one input line: a JSON result from solve.py with a path, or a state to solve first.
+
+  Args:
+  - index (int): The line number, used to name the output.
+  - line (str): The input line.
+  - out_dir (str): The directory for all outputs.
+  - fmt (str): 'apng' or 'png'.
+  - delay (int): The time each frame is shown, in milliseconds.
+  - tile_len (int): The side length of each tile.
+
+  Returns:
+  - dict: The line number and the file written, or an error message.
+  """
+
+  try:
+    if line.lstrip().startswith('{'):
+      result = json.loads(line)
+      index = result.get('index', index)
+      if not result.get('path'):
+        return {'index': index, 'error': result.get('error', 'no path')}
+      path = [[tile_chars.index(char) for char in statestr] for statestr in result['path']]
+    else:
+      puzzle = SlidingPuzzle(parse_state(line))
+      path = puzzle.solve_idastar()
+      if path is None:
+        return {'index': index, 'error': 'unsolvable'}
+    name = f'{index:06d}.png' if fmt == 'apng' else f'{index:06d}'
+    return {'index': index, 'output': render_path(path, os.path.join(out_dir, name), fmt, delay, tile_len)}
+  except ValueError as error:
+    return {'index': index, 'error': str(error)}
+
+def run(lines, out_dir: str, fmt: str = 'apng', delay: int = 500, tile_len: int = 100, workers: int = 1) -> None:
+  """
+  Renders every input line, on several worker processes if asked, reporting each as JSONL.
+
+  Args:
+  - lines (iterable[str]): The input lines.
+  - out_dir (str): The directory for all outputs.
+  - fmt (str, optional): 'apng' or 'png'. Default is apng.
+  - delay (int, optional): The time each frame is shown, in milliseconds. Default is 500.
+  - tile_len (int, optional): The side length of each tile. Default is 100.
+  - workers (int, optional): The number of worker processes. Default is 1 (render in process).
+  """
+
+  os.makedirs(out_dir, exist_ok=True)
+  numbered = ((index, line) for index, line in enumerate(lines) if line.strip())
+  if workers <= 1:
+    _init_worker()
+    for index, line in numbered:
+      print(json.dumps(render_line(index, line, out_dir, fmt, delay, tile_len)), flush=True)
+    return
+
+  with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+    # Keep a bounded number of puzzles in flight so the input is read lazily
+    pending: deque = deque()
+    for index, line in islice(numbered, 2 * workers):
+      pending.append(pool.submit(render_line, index, line, out_dir, fmt, delay, tile_len))
+    while pending:
+      print(json.dumps(pending.popleft().result()), flush=True)
+      for index, line in islice(numbered, 1):
+        pending.append(pool.submit(render_line, index, line, out_dir, fmt, delay, tile_len))
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Render solution paths to animated PNGs or PNG sequences without a display.')
+  parser.add_argument('input', nargs='?', default='-', help='solve.py JSONL results or states, one per line (default: stdin)')
+  parser.add_argument('-o', '--output', default='frames', help='output directory (default: frames)')
+  parser.add_argument('-f', '--format', choices=['apng', 'png'], default='apng')
+  parser.add_argument('-d', '--delay', type=int, default=500, help='milliseconds per frame (default: 500)')
+  parser.add_argument('-t', '--tile-len', type=int, default=100, help='tile side length in pixels (default: 100)')
+  parser.add_argument('-w', '--workers', type=int, default=1, help='worker processes (default: 1)')
+  args = parser.parse_args()
+
+  infile = sys.stdin if args.input == '-' else open(args.input)
+  with infile:
+    run(infile, args.output, args.format, args.delay, args.tile_len, args.workers)
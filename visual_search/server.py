@@ -0,0 +1,346 @@
+"""Local solver server: keeps tables warm in a worker pool and answers solve requests over a socket."""
+
+import argparse
+import asyncio
+import heuristics
+import json
+import os
+import signal
+import sys
+import table
+import time
+
+from cache import SolutionCache
+from client import default_address, parse_address
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from solve import heuristic_solvers, parse_state, solve_state, solvers
+
+# Sides whose heuristic tables are loaded when a worker starts
+warm_sides: tuple[int, ...] = (3, 4)
+
+# The worker's solution cache, opened by _warm when the server has one
+_cache: SolutionCache = None
+
+def parse_request(words: list[str]) -> tuple[list[int], str, str, list[int]]:
+  """
+  Parses the arguments of a SOLVE request: a state, then optional solver=, heuristic= and goal=
+  options.
+
+  Args:
+  - words (list[str]): The words after SOLVE.
+
+  Returns:
+  - tuple: The state, solver name, heuristic name and goal (or None).
+
+  Raises:
+  - ValueError: If the request is malformed or names an unknown solver or heuristic.
+  """
+
+  if not words:
+    raise ValueError('SOLVE needs a state')
+  options: dict[str, str] = {'solver': 'astar', 'heuristic': 'manhattan', 'goal': None}
+  for word in words[1:]:
+    key, sep, value = word.partition('=')
+    if not sep or key not in options:
+      raise ValueError(f'unknown option {word}')
+    options[key] = value
+
+  if options['solver'] not in solvers:
+    raise ValueError(f'unknown solver {options["solver"]}')
+  if options['heuristic'] not in heuristics.heuristics:
+    raise ValueError(f'unknown heuristic {options["heuristic"]}')
+  if options['heuristic'] != 'manhattan' and options['solver'] not in heuristic_solvers:
+    raise ValueError(f'heuristic does not apply to {options["solver"]}')
+  goal = parse_state(options['goal']) if options['goal'] is not None else None
+  return parse_state(words[0]), options['solver'], options['heuristic'], goal
+
+def format_result(result: dict) -> str:
+  """
+  Formats the result of solve.solve_state as a response line (see client.parse_response).
+  """
+
+  if result['path'] is None:
+    return f'NONE {result["expanded"]} {result["time"]:.6f}'
+  return f'OK {result["expanded"]} {result["time"]:.6f} {" ".join(result["path"])}'
+
+def solve_batch(requests: list[tuple]) -> list[str]:
+  """
+  Solves a batch of parsed requests in a worker process.
+
+  Args:
+  - requests (list[tuple]): The (state, solver, heuristic, goal) of each request.
+
+  Returns:
+  - list[str]: The response line of each request, in order.
+  """
+
+  lines: list[str] = []
+  for state, solver, heuristic, goal in requests:
+    try:
+      lines.append(format_result(solve_state(state, solver, heuristic, goal, _cache)))
+    except ValueError as error:
+      lines.append(f'ERR {error}')
+  return lines
+
+def _warm(names: tuple[str, ...], cache: str = None) -> None:
+  """
+  Loads the distance table and the named heuristics' tables in a new worker process, so no
+  request pays for them, and opens the worker's own connection to the solution cache.
+  """
+
+  global _cache
+  if cache is not None:
+    _cache = SolutionCache(path=cache)
+  table.distance_table()
+  for name in names:
+    for side in warm_sides:
+      try:
+        heuristics.get_heuristic(name, side)
+      except ValueError:
+        pass # Not supported on this board
+
+def _ready() -> int:
+  return os.getpid()
+
+class SolverServer:
+  """
+  Answers solve requests from many connections, batching them onto a process pool.
+
+  Each connection sends one request per line and gets one response per line, in order; requests
+  may be pipelined. Concurrent SOLVE requests are gathered for up to batch_delay seconds (or
+  until batch_size arrive) and sent to a worker as one task. At most one batch per worker is in
+  flight, so requests arriving while every worker is busy form larger batches.
+
+  Protocol:
+  - SOLVE <state> [solver=<name>] [heuristic=<name>] [goal=<state>]: answered with
+    'OK <expanded> <seconds> <state> ...' (the path), 'NONE <expanded> <seconds>' or 'ERR <message>'.
+  - STATS: answered with 'STATS <json>', see stats.
+  - PING: answered with 'PONG'.
+  - QUIT: closes the connection.
+
+  Parameters:
+  - workers (int, optional): The number of worker processes. Default is the CPU count.
+  - batch_size (int, optional): The most requests per batch. Default is 32.
+  - batch_delay (float, optional): Seconds to wait for more requests after the first. Default is 0.002.
+  - warm (tuple[str, ...], optional): Heuristics to load in every worker at start. Default is ('manhattan',).
+  - window (int, optional): The number of recent requests the latency percentiles cover. Default is 10000.
+  - cache (str, optional): A sqlite file of solutions that every worker reads and extends. Default is None.
+
+  Methods:
+  - serve(address): Listens on a Unix socket path or (host, port) until stopped.
+  - stats() -> dict: Request counts, throughput and latency percentiles.
+  """
+
+  def __init__(self, workers: int = None, batch_size: int = 32, batch_delay: float = 0.002, warm: tuple[str, ...] = ('manhattan',), window: int = 10000, cache: str = None) -> None:
+    self.workers: int = workers or os.cpu_count() or 1
+    self.batch_size: int = batch_size
+    self.batch_delay: float = batch_delay
+    self.warm: tuple[str, ...] = tuple(warm)
+    self.cache: str = cache
+
+    self.started: float = time.monotonic()
+    self.requests: int = 0
+    self.completed: int = 0
+    self.errors: int = 0
+    self.batches: int = 0
+    self.batched: int = 0
+    self.latencies: deque = deque(maxlen=window) # Seconds from request to response
+    self.completions: deque = deque(maxlen=window) # Monotonic time of each response
+
+    self._pool: ProcessPoolExecutor = None
+    self._queue: asyncio.Queue = None
+    self._slots: asyncio.Semaphore = None
+
+  def stats(self) -> dict:
+    """
+    Returns the server's figures.
+
+    Throughput is over the whole uptime and over the last ten seconds; latencies, from a request
+    being read to its response being ready, are over the last window requests.
+
+    Returns:
+    - dict: uptime, requests, completed, errors, batches, mean_batch, in_flight, throughput,
+      recent_throughput (requests per second) and p50_ms, p99_ms, max_ms.
+    """
+
+    now: float = time.monotonic()
+    uptime: float = now - self.started
+    recent: int = sum(1 for finished in self.completions if now - finished <= 10.0)
+    latencies: list[float] = sorted(self.latencies)
+
+    def percentile(p: float) -> float:
+      if not latencies:
+        return 0.0
+      return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    return {
+      'uptime': uptime,
+      'requests': self.requests,
+      'completed': self.completed,
+      'errors': self.errors,
+      'batches': self.batches,
+      'mean_batch': self.batched / self.batches if self.batches else 0.0,
+      'in_flight': self.requests - self.completed,
+      'throughput': self.completed / uptime if uptime else 0.0,
+      'recent_throughput': recent / min(10.0, uptime) if uptime else 0.0,
+      'p50_ms': percentile(0.5),
+      'p99_ms': percentile(0.99),
+      'max_ms': latencies[-1] * 1000 if latencies else 0.0
+    }
+
+  def _finish(self, future: asyncio.Future, started: float, line: str) -> None:
+    now: float = time.monotonic()
+    self.completed += 1
+    self.latencies.append(now - started)
+    self.completions.append(now)
+    if line.startswith('ERR'):
+      self.errors += 1
+    future.set_result(line)
+
+  async def _run_batch(self, batch: list[tuple]) -> None:
+    loop = asyncio.get_running_loop()
+    try:
+      lines = await loop.run_in_executor(self._pool, solve_batch, [request for request, _, _ in batch])
+    except Exception as error: # A worker died; fail the batch, not the server
+      lines = [f'ERR {type(error).__name__}: {error}'] * len(batch)
+    finally:
+      self._slots.release()
+    for (_, future, started), line in zip(batch, lines):
+      self._finish(future, started, line)
+
+  async def _batcher(self) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+      batch: list[tuple] = [await self._queue.get()]
+      deadline: float = loop.time() + self.batch_delay
+      while len(batch) < self.batch_size:
+        if not self._queue.empty():
+          batch.append(self._queue.get_nowait())
+          continue
+        remaining: float = deadline - loop.time()
+        if remaining <= 0:
+          break
+        try:
+          batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+        except asyncio.TimeoutError:
+          break
+      # Wait for a free worker; meanwhile new requests queue up for the next batch
+      await self._slots.acquire()
+      self.batches += 1
+      self.batched += len(batch)
+      loop.create_task(self._run_batch(batch))
+
+  async def _write(self, responses: asyncio.Queue, writer: asyncio.StreamWriter) -> None:
+    while True:
+      response = await responses.get()
+      if response is None:
+        break
+      if isinstance(response, asyncio.Future):
+        response = await response
+      writer.write(response.encode('ascii') + b'\n')
+      await writer.drain()
+
+  async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    loop = asyncio.get_running_loop()
+    # Responses in request order; reading goes on while earlier requests are being solved
+    responses: asyncio.Queue = asyncio.Queue()
+    writing = loop.create_task(self._write(responses, writer))
+    try:
+      while True:
+        line: bytes = await reader.readline()
+        if not line:
+          break
+        words: list[str] = line.decode('ascii', 'replace').split()
+        if not words:
+          continue
+        command: str = words[0].upper()
+        if command == 'SOLVE':
+          self.requests += 1
+          future: asyncio.Future = loop.create_future()
+          try:
+            request = parse_request(words[1:])
+          except ValueError as error:
+            self._finish(future, time.monotonic(), f'ERR {error}')
+          else:
+            self._queue.put_nowait((request, future, time.monotonic()))
+          responses.put_nowait(future)
+        elif command == 'STATS':
+          responses.put_nowait(f'STATS {json.dumps(self.stats())}')
+        elif command == 'PING':
+          responses.put_nowait('PONG')
+        elif command == 'QUIT':
+          break
+        else:
+          responses.put_nowait(f'ERR unknown command {words[0]}')
+    except ConnectionError:
+      pass
+    finally:
+      responses.put_nowait(None)
+      try:
+        await writing
+      except ConnectionError:
+        pass
+      writer.close()
+
+  async def serve(self, address=None) -> None:
+    """
+    Starts the workers, loads their tables and answers requests until cancelled or sent SIGINT
+    or SIGTERM; a Unix socket file is removed on the way out.
+
+    Args:
+    - address (str or tuple[str, int], optional): A Unix socket path or (host, port). Default is client.default_address.
+    """
+
+    if address is None:
+      address = default_address
+    loop = asyncio.get_running_loop()
+    self._queue = asyncio.Queue()
+    self._slots = asyncio.Semaphore(self.workers)
+    self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm, initargs=(self.warm, self.cache))
+    try:
+      # Start every worker now, so the first requests do not wait for the tables
+      await asyncio.gather(*(loop.run_in_executor(self._pool, _ready) for _ in range(self.workers)))
+      if isinstance(address, str):
+        if os.path.exists(address):
+          os.unlink(address) # Left behind by a server that did not shut down cleanly
+        server = await asyncio.start_unix_server(self._handle, path=address)
+      else:
+        server = await asyncio.start_server(self._handle, *address)
+      self.started = time.monotonic()
+      print(f'listening on {address} with {self.workers} workers', file=sys.stderr)
+      batcher = loop.create_task(self._batcher())
+      stopped: asyncio.Future = loop.create_future()
+      for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+          loop.add_signal_handler(signum, lambda: stopped.done() or stopped.set_result(None))
+        except (NotImplementedError, RuntimeError):
+          pass # No signal handlers on this platform or thread
+      try:
+        async with server:
+          await stopped
+      finally:
+        batcher.cancel()
+        if isinstance(address, str) and os.path.exists(address):
+          os.unlink(address)
+    finally:
+      self._pool.shutdown(cancel_futures=True)
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Serve solve requests from a warm worker pool.')
+  parser.add_argument('-a', '--address', type=parse_address, default=default_address, help=f"Unix socket path, or 'host:port' for TCP (default: {default_address})")
+  parser.add_argument('-w', '--workers', type=int, default=None, help='worker processes (default: CPU count)')
+  parser.add_argument('-b', '--batch-size', type=int, default=32, help='most requests per batch (default: 32)')
+  parser.add_argument('-d', '--batch-delay', type=float, default=2.0, help='milliseconds to gather a batch (default: 2)')
+  parser.add_argument('--warm', nargs='+', default=['manhattan'], help='heuristics to load at start (default: manhattan)')
+  parser.add_argument('--cache', metavar='PATH', default=None, help='sqlite file of solutions to reuse and extend')
+  args = parser.parse_args()
+  for name in args.warm:
+    if name not in heuristics.heuristics:
+      parser.error(f'unknown heuristic {name}')
+
+  server = SolverServer(args.workers, args.batch_size, args.batch_delay / 1000, args.warm, cache=args.cache)
+  try:
+    asyncio.run(server.serve(args.address))
+  except KeyboardInterrupt:
+    pass
@@ -0,0 +1,272 @@
+"""Headless batch solver: reads states one per line and writes JSONL results."""
+
+import argparse
+import client
+import heuristics
+import json
+import os
+import sys
+import table
+import time
+
+from cache import SolutionCache
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from puzzle import SlidingPuzzle
+from utils import state2str, tile_chars
+
+solvers: dict[str, str] = {
+  'astar': 'solve_astar',
+  'idastar': 'solve_idastar',
+  'table': 'solve_table',
+  'bfs': 'solve_bidirectional',
+  'mm': 'solve_bidirectional'
+}
+
+# Solvers that take a heuristic argument
+heuristic_solvers: set[str] = {'astar', 'idastar'}
+
+_solver: str = 'astar'
+_goal: list[int] = None
+_heuristic: str = 'manhattan'
+_cache: SolutionCache = None
+
+def parse_state(line: str) -> list[int]:
+  """
+  Parses one input line into a state.
+
+  Lines are either separated integers ('1 2 0 3 ...' or '1,2,0,3,...') or a state string
+  with one character per tile ('120345678').
+
+  Args:
+  - line (str): The input line.
+
+  Returns:
+  - list[int]: The state represented as a list of integers.
+
+  Raises:
+  - ValueError: If the line contains an unknown tile character.
+  """
+
+  line = line.strip()
+  if ',' in line or ' ' in line:
+    return [int(value) for value in line.replace(',', ' ').split()]
+  return [tile_chars.index(char) for char in line.lower()]
+
+def solve_state(state: list[int], solver: str = 'astar', heuristic: str = 'manhattan', goal: list[int] = None, cache: SolutionCache = None) -> dict:
+  """
+  Solves one state and describes the result.
+
+  Args:
+  - state (list[int]): The state to solve.
+  - solver (str, optional): The solver name (a key of solvers). Default is astar.
+  - heuristic (str, optional): The heuristic name, for the solvers in heuristic_solvers. Default is manhattan.
+  - goal (list[int], optional): The goal state. Default is the identity permutation.
+  - cache (SolutionCache, optional): Answers states on a cached path without a search, and
+    caches new paths. Every solver here is optimal, so all can share one cache. Default is None.
+
+  Returns:
+  - dict: The solve time, the path as state strings (or None), its length and the nodes expanded
+    (0 for a cache hit).
+
+  Raises:
+  - ValueError: If the state or goal is not valid, or the heuristic does not support the board.
+  """
+
+  puzzle = SlidingPuzzle(state, goal=goal)
+  options: dict = {}
+  if solver == 'mm':
+    options['mm'] = True
+  elif solver in heuristic_solvers:
+    options['heuristic'] = heuristic
+  start = time.perf_counter()
+  if cache is not None:
+    path = cache.solve(puzzle, solvers[solver], **options)
+  else:
+    path = getattr(puzzle, solvers[solver])(**options)
+  result: dict = {'time': time.perf_counter() - start}
+
+  if path is None:
+    result.update(path=None, length=None)
+  else:
+    result.update(path=[state2str(state) for state in path], length=len(path) - 1)
+  result['expanded'] = puzzle.nodes_expanded
+  return result
+
+def solve_line(index: int, line: str) -> dict:
+  """
+  Solves the state on one input line with the worker's solver.
+
+  Args:
+  - index (int): The line number, echoed in the result.
+  - line (str): The input line.
+
+  Returns:
+  - dict: The JSON result with the path as state strings, its length, nodes expanded and time,
+    or an error message.
+  """
+
+  result: dict = {'index': index, 'state': line.strip()}
+  try:
+    result.update(solve_state(parse_state(line), _solver, _heuristic, _goal, _cache))
+  except ValueError as error:
+    result['error'] = str(error)
+  return result
+
+def solve_chunk(chunk: list[tuple[int, str]]) -> list[dict]:
+  """
+  Solves a chunk of numbered input lines.
+
+  Args:
+  - chunk (list[tuple[int, str]]): Pairs of (line number, line).
+
+  Returns:
+  - list[dict]: The results, in the same order as the chunk.
+  """
+
+  return [solve_line(index, line) for index, line in chunk]
+
+def _init_worker(solver: str, goal: list[int] = None, heuristic: str = 'manhattan', cache: str = None) -> None:
+  """
+  Sets up a worker process: records the solver, goal and heuristic and loads their tables once.
+
+  Args:
+  - solver (str): The solver name (a key of solvers).
+  - goal (list[int], optional): The goal state. Default is the identity permutation.
+  - heuristic (str, optional): The heuristic name, for the solvers in heuristic_solvers. Default is manhattan.
+  - cache (str, optional): A sqlite file for a SolutionCache; each worker opens its own connection. Default is None.
+  """
+
+  global _solver, _goal, _heuristic, _cache
+  _solver, _goal, _heuristic = solver, goal, heuristic
+  if cache is not None:
+    _cache = SolutionCache(path=cache)
+  if solver == 'table':
+    table.distance_table()
+
+def run(lines, out, solver: str = 'astar', workers: int = None, chunksize: int = 64, ordered: bool = True, goal: list[int] = None, heuristic: str = 'manhattan', cache: str = None) -> None:
+  """
+  Solves every line of the input on a process pool and streams the results.
+
+  At most two chunks per worker are in flight, so the input is never read far ahead of the
+  output.
+
+  Args:
+  - lines (iterable[str]): The input lines.
+  - out (file): The output stream for JSONL results.
+  - solver (str, optional): The solver name (a key of solvers). Default is astar.
+  - workers (int, optional): The number of worker processes. Default is the CPU count.
+  - chunksize (int, optional): The number of lines sent to a worker at a time. Default is 64.
+  - ordered (bool, optional): Write results in input order if True, in completion order if False.
+    Default is True.
+  - goal (list[int], optional): The goal state for every line. Default is the identity permutation.
+  - heuristic (str, optional): The heuristic name, for the solvers in heuristic_solvers. Default is manhattan.
+  - cache (str, optional): A sqlite file of solutions shared by the workers and kept across runs. Default is None.
+  """
+
+  workers = workers or os.cpu_count() or 1
+  numbered = ((index, line) for index, line in enumerate(lines) if line.strip())
+  with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(solver, goal, heuristic, cache)) as pool:
+    window: int = 2 * workers
+    pending: deque = deque()
+
+    def submit() -> bool:
+      chunk = list(islice(numbered, chunksize))
+      if chunk:
+        pending.append(pool.submit(solve_chunk, chunk))
+      return bool(chunk)
+
+    more: bool = True
+    while more and len(pending) < window:
+      more = submit()
+
+    while pending:
+      if ordered:
+        done = [pending.popleft()]
+      else:
+        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+        done = [future for future in pending if future in finished]
+        for future in done:
+          pending.remove(future)
+
+      for future in done:
+        for result in future.result():
+          out.write(json.dumps(result) + '\n')
+        out.flush()
+        if more:
+          more = submit()
+
+def run_remote(lines, out, address=None, solver: str = 'astar', goal: list[int] = None, heuristic: str = 'manhattan', window: int = 256) -> None:
+  """
+  Solves every line of the input on a solver server (see server.py) and streams the results in
+  input order, in the same format as run.
+
+  Args:
+  - lines (iterable[str]): The input lines.
+  - out (file): The output stream for JSONL results.
+  - address (str or tuple[str, int], optional): The server's address. Default is client.default_address.
+  - solver (str, optional): The solver name (a key of solvers). Default is astar.
+  - goal (list[int], optional): The goal state for every line. Default is the identity permutation.
+  - heuristic (str, optional): The heuristic name, for the solvers in heuristic_solvers. Default is manhattan.
+  - window (int, optional): The most requests in flight. Default is 256.
+
+  Raises:
+  - OSError: If the server cannot be reached.
+  """
+
+  # Lines in input order, with the parse error of those never sent
+  pending: deque = deque()
+
+  def states():
+    for index, line in enumerate(lines):
+      if not line.strip():
+        continue
+      try:
+        state = parse_state(line)
+      except ValueError as error:
+        pending.append((index, line, str(error)))
+        continue
+      pending.append((index, line, None))
+      yield state
+
+  def write_errors() -> None:
+    while pending and pending[0][2] is not None:
+      index, line, error = pending.popleft()
+      out.write(json.dumps({'index': index, 'state': line.strip(), 'error': error}) + '\n')
+
+  with client.SolverClient(address) as connection:
+    for response in connection.solve_many(states(), solver, heuristic, goal, window):
+      write_errors()
+      index, line, _ = pending.popleft()
+      out.write(json.dumps({'index': index, 'state': line.strip(), **response}) + '\n')
+    write_errors()
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Solve sliding puzzles in batch and write JSONL results.')
+  parser.add_argument('input', nargs='?', default='-', help='file with one state per line (default: stdin)')
+  parser.add_argument('-o', '--output', default='-', help='output file (default: stdout)')
+  parser.add_argument('-s', '--solver', choices=sorted(solvers), default='astar')
+  parser.add_argument('-w', '--workers', type=int, default=None, help='worker processes (default: CPU count)')
+  parser.add_argument('-c', '--chunksize', type=int, default=64, help='lines per task (default: 64)')
+  parser.add_argument('--unordered', action='store_true', help='write results in completion order')
+  parser.add_argument('-g', '--goal', type=parse_state, default=None, help='goal state, in the input format (default: blank first)')
+  parser.add_argument('-H', '--heuristic', choices=sorted(heuristics.heuristics), default='manhattan', help='heuristic for astar and idastar (default: manhattan)')
+  parser.add_argument('--cache', metavar='PATH', default=None, help='sqlite file of solutions to reuse and extend')
+  parser.add_argument('--server', nargs='?', type=client.parse_address, const=client.default_address, default=None, help='solve on a running server.py instead of a local pool (default address: %(const)s)')
+  args = parser.parse_args()
+  if args.heuristic != 'manhattan' and args.solver not in heuristic_solvers:
+    parser.error(f'--heuristic does not apply to {args.solver}')
+  if args.cache is not None and args.server is not None:
+    parser.error('--cache applies to local solving; start server.py with --cache instead')
+
+  infile = sys.stdin if args.input == '-' else open(args.input)
+  outfile = sys.stdout if args.output == '-' else open(args.output, 'w')
+  with infile, outfile:
+    if args.server is not None:
+      try:
+        run_remote(infile, outfile, args.server, args.solver, args.goal, args.heuristic)
+      except OSError as error:
+        parser.error(f'cannot reach the solver server: {error}')
+    else:
+      run(infile, outfile, args.solver, args.workers, args.chunksize, not args.unordered, args.goal, args.heuristic, args.cache)
@@ -0,0 +1,105 @@
+"""Exact distance table for every solvable 8-puzzle state."""
+
+import argparse
+import mmap
+import utils
+
+from collections import deque
+from utils import pack, unpack, packed_neighbors, rank
+
+# Marks the ranks of states that cannot reach the goal
+unreachable: int = 0xFF
+table_len: int = utils.factorials[utils.num_tiles]
+
+_table = None
+
+def build_distance_table(goal_state: list[int] = None) -> bytearray:
+  """
+  Runs breadth-first search backward from the goal and records every state's exact distance.
+
+  Moves are reversible, so the distance from the goal to a state is also the distance from
+  that state to the goal.
+
+  Args:
+  - goal_state (list[int], optional): The goal state. Default is the identity permutation.
+
+  Returns:
+  - bytearray: table[rank(state)] is the optimal solution length of state, or unreachable.
+  """
+
+  if goal_state is None:
+    goal_state = list(range(utils.num_tiles))
+
+  goal: int = pack(goal_state)
+  distances: dict[int, int] = {goal: 0}
+  frontier: deque = deque([(goal, goal_state.index(0))])
+
+  while frontier:
+    state, z_index = frontier.popleft()
+    d = distances[state] + 1
+    for neighbor, n_index, _ in packed_neighbors(state, z_index):
+      if neighbor not in distances:
+        distances[neighbor] = d
+        frontier.append((neighbor, n_index))
+
+  table: bytearray = bytearray([unreachable]) * table_len
+  for state, d in distances.items():
+    table[rank(unpack(state))] = d
+  return table
+
+def save_distance_table(table: bytearray, path: str = utils.table_fp) -> None:
+  """
+  Writes a distance table to disk atomically (see utils.save_table).
+
+  Args:
+  - table (bytearray): The table from build_distance_table.
+  - path (str, optional): The destination file. Default is utils.table_fp.
+  """
+
+  utils.save_table(table, path)
+
+def load_distance_table(path: str = utils.table_fp) -> mmap.mmap:
+  """
+  Memory-maps a distance table read-only, so pages are shared between processes.
+
+  Args:
+  - path (str, optional): The table file. Default is utils.table_fp.
+
+  Returns:
+  - mmap.mmap: The mapped table, indexed by permutation rank.
+
+  Raises:
+  - ValueError: If the file is not the size of a full table.
+  """
+
+  return utils.load_table(path, table_len)
+
+def distance_table():
+  """
+  Returns the default distance table, loading it on first use.
+
+  If the table file is missing or the wrong size it is built and saved. When the file cannot
+  be written the table is kept in memory only.
+
+  Returns:
+  - mmap.mmap or bytearray: The distance table, indexed by permutation rank.
+  """
+
+  global _table
+  if _table is None:
+    _table = utils.cached_table(utils.table_fp, table_len, build_distance_table)
+  return _table
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Build the 8-puzzle distance table.')
+  parser.add_argument('path', nargs='?', default=utils.table_fp, help='output file')
+  parser.add_argument('--numpy', action='store_true', help='build with the vectorized NumPy engine')
+  args = parser.parse_args()
+
+  if args.numpy:
+    import vectorized
+    table = vectorized.build_distance_table()
+  else:
+    table = build_distance_table()
+  save_distance_table(table, args.path)
+  print(f'wrote {args.path}: {table_len - table.count(unreachable)} states, max depth {max(d for d in table if d != unreachable)}')
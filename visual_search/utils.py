@@ -1,7 +1,26 @@
+import heapq
+import mmap
+import os
+
+from array import array
+
+from functools import lru_cache
+from itertools import count
 from sys import maxsize
+from time import perf_counter
 
 num_tiles: int = 9
+board_len: int = 3
 controls_fp: str = 'visual_search/controls.txt'
+table_fp: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eight_puzzle.dist')
+
+# Packed state layout: each cell holds its tile in a fixed-width field, cell i at bits
+# i*bits..i*bits+bits-1. Boards up to 4x4 use 4 bits per cell, 5x5 boards need 5.
+tile_bits: int = 4
+tile_mask: int = (1 << tile_bits) - 1
+
+# Tile labels used in state strings; 0-9 match the 8-puzzle's digits
+tile_chars: str = '0123456789abcdefghijklmnopqrstuvwxyz'
 
 # Formatting functions
 def str2intlist(s: str, max_len: int = maxsize) -> list[int]:
@@ -34,30 +53,325 @@ def str2intlist(s: str, max_len: int = maxsize) -> list[int]:
 
   return result
 
+def state2str(state: list[int]) -> str:
+  """
+  Converts a state to a string with one character per tile (see tile_chars).
+
+  Args:
+  - state (list[int]): The state represented as a list of integers.
+
+  Returns:
+  - str: The state string, e.g. '012345678' for the 8-puzzle goal.
+  """
+
+  return ''.join(tile_chars[value] for value in state)
+
+def bits_for(n: int) -> int:
+  """
+  Returns the packed field width needed for a board with n cells.
+
+  Args:
+  - n (int): The number of cells on the board.
+
+  Returns:
+  - int: The number of bits per cell.
+  """
+
+  return max(tile_bits, (n - 1).bit_length())
+
+def pack(state: list[int], bits: int = tile_bits) -> int:
+  """
+  Packs a list state into a single integer, one fixed-width field per cell.
+
+  Args:
+  - state (list[int]): The state represented as a list of integers.
+  - bits (int, optional): The field width. Default is tile_bits.
+
+  Returns:
+  - int: The packed state, with cell i stored at bits i*bits to i*bits+bits-1.
+  """
+
+  packed: int = 0
+  for index, value in enumerate(state):
+    packed |= value << (index * bits)
+  return packed
+
+def unpack(packed: int, n: int = num_tiles, bits: int = tile_bits) -> list[int]:
+  """
+  Unpacks a packed integer state back into a list of integers.
+
+  Args:
+  - packed (int): The packed state.
+  - n (int, optional): The number of cells on the board. Default is num_tiles.
+  - bits (int, optional): The field width. Default is tile_bits.
+
+  Returns:
+  - list[int]: The state represented as a list of integers.
+  """
+
+  mask: int = (1 << bits) - 1
+  return [(packed >> (index * bits)) & mask for index in range(n)]
+
+@lru_cache(maxsize=None)
+def move_tables(side: int) -> list[tuple[int, ...]]:
+  """
+  Builds the blank transition table for a square board.
+
+  Args:
+  - side (int): The side length of the board.
+
+  Returns:
+  - list[tuple[int, ...]]: For each blank index, the indices the blank can move to.
+  """
+
+  table: list[tuple[int, ...]] = []
+  for index in range(side * side):
+    x, y = index % side, index // side
+    moves: list[int] = []
+    if y > 0:
+      moves.append(index - side)
+    if x > 0:
+      moves.append(index - 1)
+    if x < side - 1:
+      moves.append(index + 1)
+    if y < side - 1:
+      moves.append(index + side)
+    table.append(tuple(moves))
+  return table
+
+# Legal blank moves for every blank index on the 3x3 board
+move_table: list[tuple[int, ...]] = move_tables(board_len)
+
+# Permutation ranking (Lehmer code)
+factorials: list[int] = [1]
+for _i in range(1, 26):
+  factorials.append(factorials[-1] * _i)
+
+@lru_cache(maxsize=None)
+def _popcounts(n: int):
+  """
+  Returns a callable counting the set bits of a mask below 2^n: a table lookup up to 16 bits,
+  string counting beyond.
+  """
+
+  if n <= 16:
+    counts: bytearray = bytearray(1 << n)
+    for mask in range(1, 1 << n):
+      counts[mask] = counts[mask >> 1] + (mask & 1)
+    return bytes(counts).__getitem__
+  return lambda mask: bin(mask).count('1')
+
+def rank(state: list[int]) -> int:
+  """
+  Ranks a permutation to its index in lexicographic order, in [0, n!).
+
+  Each Lehmer digit is the value minus the number of smaller values already seen, read from
+  a bitmask of the seen values, so the rank takes O(n) rather than O(n^2).
+
+  Args:
+  - state (list[int]): A permutation of 0 to n-1.
+
+  Returns:
+  - int: The Lehmer code rank of the permutation.
+  """
+
+  n: int = len(state)
+  popcount = _popcounts(n)
+  seen: int = 0
+  result: int = 0
+  for i in range(n - 1):
+    value = state[i]
+    result += (value - popcount(seen & ((1 << value) - 1))) * factorials[n - 1 - i]
+    seen |= 1 << value
+  return result
+
+def rank_packed(packed: int, n: int = num_tiles, bits: int = tile_bits) -> int:
+  """
+  Ranks a packed state without unpacking it (see rank).
+
+  Args:
+  - packed (int): The packed state.
+  - n (int, optional): The number of cells. Default is num_tiles.
+  - bits (int, optional): The field width. Default is tile_bits.
+
+  Returns:
+  - int: The Lehmer code rank of the state.
+  """
+
+  popcount = _popcounts(n)
+  mask: int = (1 << bits) - 1
+  seen: int = 0
+  result: int = 0
+  for i in range(n - 1):
+    value = packed & mask
+    packed >>= bits
+    result += (value - popcount(seen & ((1 << value) - 1))) * factorials[n - 1 - i]
+    seen |= 1 << value
+  return result
+
+def unrank(r: int, n: int = num_tiles) -> list[int]:
+  """
+  Inverse of rank: builds the permutation of 0 to n-1 with the given rank.
+
+  Args:
+  - r (int): The rank, in [0, n!).
+  - n (int, optional): The length of the permutation. Default is num_tiles.
+
+  Returns:
+  - list[int]: The permutation.
+  """
+
+  remaining: list[int] = list(range(n))
+  state: list[int] = []
+  for i in range(n - 1, -1, -1):
+    digit, r = divmod(r, factorials[i])
+    state.append(remaining.pop(digit))
+  return state
+
+def solvable(state: list[int], goal: list[int] = None, side: int = board_len) -> bool:
+  """
+  Checks in O(n) whether a state can reach a goal.
+
+  Every move swaps the blank with a tile, which flips the parity of the permutation taking the
+  goal to the state and moves the blank one cell. The two parities therefore change together,
+  and a state can reach the goal exactly when the permutation parity equals the parity of the
+  blank's Manhattan distance from its goal cell.
+
+  Args:
+  - state (list[int]): The state represented as a list of integers.
+  - goal (list[int], optional): The goal state. Default is the identity permutation.
+  - side (int, optional): The side length of the board. Default is board_len.
+
+  Returns:
+  - bool: True if the goal can be reached.
+  """
+
+  n: int = len(state)
+  if goal is None:
+    goal = range(n)
+  where: list[int] = [0] * n
+  for index, value in enumerate(goal):
+    where[value] = index
+
+  # The parity of a permutation is the parity of n minus its number of cycles
+  seen: list[bool] = [False] * n
+  cycles: int = 0
+  for start in range(n):
+    if not seen[start]:
+      cycles += 1
+      index = start
+      while not seen[index]:
+        seen[index] = True
+        index = where[state[index]]
+
+  z, goal_z = state.index(0), where[0]
+  blank_dist: int = abs(z % side - goal_z % side) + abs(z // side - goal_z // side)
+  return (n - cycles) % 2 == blank_dist % 2
+
+def manhattan_tables(side: int, goal: tuple[int, ...] = None) -> tuple[list[list[int]], list[list[list[int]]]]:
+  """
+  Returns the Manhattan distance tables for a square board and goal, building them on first use.
+
+  Tables are cached per goal, so every puzzle solving toward the same goal shares them.
+
+  Args:
+  - side (int): The side length of the board.
+  - goal (tuple[int, ...], optional): The goal state. Default is the identity permutation.
+
+  Returns:
+  - tuple: (dist, delta) where dist[tile][index] is the distance of a tile at index from its
+    goal, and delta[tile][src][dst] is the change in that distance when it moves from src to dst.
+    The blank always contributes 0.
+  """
+
+  if goal is None:
+    goal = tuple(range(side * side))
+  return _manhattan_tables(side, tuple(goal))
+
+@lru_cache(maxsize=None)
+def _manhattan_tables(side: int, goal: tuple[int, ...]) -> tuple[list[list[int]], list[list[list[int]]]]:
+  n: int = side * side
+  cells: list[list[int]] = cell_distances(side)
+  dist: list[list[int]] = [
+    cells[goal.index(t)] if t else [0] * n
+    for t in range(n)
+  ]
+  delta: list[list[list[int]]] = [
+    [[row[dst] - row[src] for dst in range(n)] for src in range(n)]
+    for row in dist
+  ]
+  return dist, delta
+
+@lru_cache(maxsize=None)
+def cell_distances(side: int) -> list[list[int]]:
+  """
+  Builds the Manhattan distance between every pair of cells on a square board.
+
+  Args:
+  - side (int): The side length of the board.
+
+  Returns:
+  - list[list[int]]: cells[a][b] is the number of moves between cell a and cell b.
+  """
+
+  n: int = side * side
+  return [[abs(a % side - b % side) + abs(a // side - b // side) for b in range(n)] for a in range(n)]
+
+def packed_neighbors(packed: int, z_index: int, moves: list[tuple[int, ...]] = move_table, bits: int = tile_bits) -> list[tuple[int, int, int]]:
+  """
+  Get the neighboring packed states by sliding a tile into the blank.
+
+  The blank cell holds 0, so swapping it with the tile at index i only subtracts the tile
+  from field i and adds it to field z_index.
+
+  Args:
+  - packed (int): The packed state.
+  - z_index (int): The index of the blank tile in the packed state.
+  - moves (list[tuple[int, ...]], optional): The board's move table. Default is the 3x3 move_table.
+  - bits (int, optional): The field width. Default is tile_bits.
+
+  Returns:
+  - list[tuple[int, int, int]]: Triples of (neighbor packed state, neighbor blank index, moved tile).
+    The moved tile travels from the neighbor blank index to z_index.
+  """
+
+  neighbors: list[tuple[int, int, int]] = []
+  mask: int = (1 << bits) - 1
+  z_shift: int = z_index * bits
+  for index in moves[z_index]:
+    shift = index * bits
+    tile = (packed >> shift) & mask
+    neighbors.append((packed - (tile << shift) + (tile << z_shift), index, tile))
+  return neighbors
+
 class Node:
   """
   Represents a node in a search space for the A* algorithm.
 
   Attributes:
-  - state (list[int]): The state represented as a list of integers.
-  - statestr (str): A string representation of the state.
+  - state (int): The state packed into an integer (see pack).
+  - z_index (int): The index of the blank tile in the state.
   - parent (Node): The parent node in the search tree. Default is None for the initial state.
   - g (int): The current path cost from the start node to this node.
   - h (int): The estimated future cost (heuristic) from this node to the goal node.
   - f (int): The total cost, where f = g + h.
+  - aux (int): Extra state an incremental heuristic keeps per node (see heuristics.py). Default is 0.
 
   Methods:
   - __lt__(self, other): Less-than comparison method. Compares nodes based on their total cost 'f'.
   - __gt__(self, other): Greater-than comparison method. Compares nodes based on their total cost 'f'.
   """
+
+  __slots__ = ('state', 'z_index', 'parent', 'g', 'h', 'f', 'aux')
   
-  def __init__(self, state, parent=None) -> None:
-    self.state: list[int] = state
-    self.statestr: str = ''.join(str(chr) for chr in state)
+  def __init__(self, state: int, z_index: int, parent=None, g: int = 0, h: int = 0, aux: int = 0) -> None:
+    self.state: int = state
+    self.z_index: int = z_index
     self.parent = parent
-    self.g = 0 # The current path cost
-    self.h = 0 # The estimated future cost
-    self.f = 0 # the total cost f = g + h
+    self.g = g # The current path cost
+    self.h = h # The estimated future cost
+    self.f = g + h # the total cost f = g + h
+    self.aux = aux
 
   def __lt__(self, other):
     """
@@ -71,4 +385,443 @@ class Node:
     Greater-than comparison method. Used to compare nodes based on their total cost 'f'.
     """
     
-    return self.f > other.f
\ No newline at end of file
+    return self.f > other.f
+
+# The largest dense closed set in bytes; bigger state spaces fall back to hashing
+bitset_limit: int = 64 << 20
+
+class RankBitset:
+  """
+  Closed set over the permutations of n cells, one bit per permutation rank.
+
+  The whole 8-puzzle space takes 9!/8 bytes (about 45 KB), and adding a state allocates
+  nothing. Each test costs a rank computation, so it saves memory rather than time.
+
+  Parameters:
+  - n (int, optional): The number of cells. Default is num_tiles.
+  - bits (int, optional): The field width of the packed states. Default is tile_bits.
+
+  Methods:
+  - add(packed: int) -> bool: Marks a state, returning False if it was already marked.
+  """
+
+  __slots__ = ('n', 'bits', '_marks', '_len')
+
+  def __init__(self, n: int = num_tiles, bits: int = tile_bits) -> None:
+    self.n: int = n
+    self.bits: int = bits
+    self._marks: bytearray = bytearray((factorials[n] + 7) >> 3)
+    self._len: int = 0
+
+  def __len__(self) -> int:
+    return self._len
+
+  def __contains__(self, packed: int) -> bool:
+    r = rank_packed(packed, self.n, self.bits)
+    return bool(self._marks[r >> 3] & (1 << (r & 7)))
+
+  def add(self, packed: int) -> bool:
+    """
+    Tests and marks a state in one step.
+
+    Args:
+    - packed (int): The packed state.
+
+    Returns:
+    - bool: True if the state was not marked before.
+    """
+
+    r = rank_packed(packed, self.n, self.bits)
+    byte, bit = r >> 3, 1 << (r & 7)
+    if self._marks[byte] & bit:
+      return False
+    self._marks[byte] |= bit
+    self._len += 1
+    return True
+
+class HashedClosedSet:
+  """
+  Closed set of packed states backed by a hash set, for boards too large for a RankBitset.
+
+  Methods:
+  - add(packed: int) -> bool: Marks a state, returning False if it was already marked.
+  """
+
+  __slots__ = ('_states',)
+
+  def __init__(self) -> None:
+    self._states: set[int] = set()
+
+  def __len__(self) -> int:
+    return len(self._states)
+
+  def __contains__(self, packed: int) -> bool:
+    return packed in self._states
+
+  def add(self, packed: int) -> bool:
+    states = self._states
+    if packed in states:
+      return False
+    states.add(packed)
+    return True
+
+def closed_set(n: int = num_tiles, bits: int = tile_bits):
+  """
+  Chooses the closed set for a board: a RankBitset when one fits in bitset_limit bytes, and a
+  HashedClosedSet otherwise (every board larger than 3x3).
+
+  Args:
+  - n (int, optional): The number of cells. Default is num_tiles.
+  - bits (int, optional): The field width of the packed states. Default is tile_bits.
+
+  Returns:
+  - RankBitset or HashedClosedSet: An empty closed set.
+  """
+
+  if factorials[n] >> 3 <= bitset_limit:
+    return RankBitset(n, bits)
+  return HashedClosedSet()
+
+class NodeArena:
+  """
+  Stores search nodes as parallel typed arrays, addressed by integer handles.
+
+  A node costs 17 bytes in the columns instead of a Node object of over 100 bytes. Handles are
+  given out in insertion order, so they double as a first-in first-out tie-breaker. States
+  wider than 64 bits (the 24-puzzle) are kept in a list instead of an array.
+
+  Parameters:
+  - n (int, optional): The number of cells on the board. Default is num_tiles.
+  - bits (int, optional): The field width of the packed states. Default is tile_bits.
+
+  Attributes:
+  - states (array or list[int]): The packed state of each node.
+  - parents (array): The handle of each node's parent, or -1 for the root.
+  - g (array): The path cost of each node.
+  - h (array): The heuristic value of each node.
+  - z_index (array): The blank index of each node, which is also the cell the last move emptied.
+
+  Methods:
+  - add(state: int, z_index: int, parent: int, g: int, h: int) -> int: Stores a node and returns its handle.
+  - node(handle: int) -> Node: Builds a Node for a handle (without its parent), e.g. for hooks.
+  - path(handle: int) -> list[int]: The packed states from the root to a node.
+  """
+
+  __slots__ = ('states', 'parents', 'g', 'h', 'z_index')
+
+  def __init__(self, n: int = num_tiles, bits: int = tile_bits) -> None:
+    self.states = array('Q') if n * bits <= 64 else []
+    self.parents = array('i')
+    self.g = array('H')
+    self.h = array('H')
+    self.z_index = array('b')
+
+  def __len__(self) -> int:
+    return len(self.parents)
+
+  def add(self, state: int, z_index: int, parent: int, g: int, h: int) -> int:
+    """
+    Stores a node.
+
+    Args:
+    - state (int): The packed state.
+    - z_index (int): The index of the blank.
+    - parent (int): The handle of the parent node, or -1 for the root.
+    - g (int): The path cost.
+    - h (int): The heuristic value.
+
+    Returns:
+    - int: The handle of the new node.
+    """
+
+    handle: int = len(self.parents)
+    self.states.append(state)
+    self.z_index.append(z_index)
+    self.parents.append(parent)
+    self.g.append(g)
+    self.h.append(h)
+    return handle
+
+  def node(self, handle: int) -> Node:
+    return Node(self.states[handle], self.z_index[handle], g=self.g[handle], h=self.h[handle])
+
+  def path(self, handle: int) -> list[int]:
+    """
+    Follows parent handles back to the root.
+
+    Args:
+    - handle (int): The last node of the path.
+
+    Returns:
+    - list[int]: The packed states from the root to the node.
+    """
+
+    states, parents = self.states, self.parents
+    path: list[int] = []
+    while handle >= 0:
+      path.append(states[handle])
+      handle = parents[handle]
+    return path[::-1]
+
+class OpenList:
+  """
+  Represents the open set of a best-first search: a binary heap plus a state index.
+
+  Entries are ordered by (f, h, insertion order), so ties on f prefer the node closer to the
+  goal and are otherwise broken first-in first-out. Improving a node that is already queued
+  invalidates its old heap entry in place (lazy deletion) instead of rebuilding the heap.
+
+  Attributes:
+  - _heap (list[list]): Heap entries of the form [f, h, count, node]; node is None once invalidated.
+  - _entries (dict[int, list]): Maps each queued state to its live heap entry.
+
+  Methods:
+  - push(node: Node) -> bool: Queues a node, or improves the queued node with the same state.
+  - pop() -> Node: Removes and returns the node with the lowest (f, h).
+  - peek() -> Node: Returns the node with the lowest (f, h) without removing it.
+  - get(state: int) -> Node: Returns the queued node for a state, or None.
+  """
+
+  def __init__(self) -> None:
+    self._heap: list[list] = []
+    self._entries: dict[int, list] = {}
+    self._counter = count()
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def __bool__(self) -> bool:
+    return bool(self._entries)
+
+  def __contains__(self, state: int) -> bool:
+    return state in self._entries
+
+  def get(self, state: int):
+    """
+    Returns the queued node for the given state.
+
+    Args:
+    - state (int): The packed state to look up.
+
+    Returns:
+    - Node or None: The queued node, or None if the state is not in the open list.
+    """
+
+    entry = self._entries.get(state)
+    return entry[3] if entry is not None else None
+
+  def push(self, node: Node) -> bool:
+    """
+    Queues a node. If its state is already queued, the cheaper of the two paths is kept.
+
+    Args:
+    - node (Node): The node to queue.
+
+    Returns:
+    - bool: True if the node was queued, False if an equal or cheaper path was already queued.
+    """
+
+    entry = self._entries.get(node.state)
+    if entry is not None:
+      if entry[3].g <= node.g:
+        return False
+      # Decrease-key: drop the stale entry, it is skipped when it reaches the top
+      entry[3] = None
+
+    entry = [node.f, node.h, next(self._counter), node]
+    self._entries[node.state] = entry
+    heapq.heappush(self._heap, entry)
+    return True
+
+  def peek(self) -> Node:
+    """
+    Returns the node with the lowest (f, h) without removing it.
+
+    Returns:
+    - Node or None: The best node in the open list, or None if it is empty.
+    """
+
+    heap = self._heap
+    while heap and heap[0][3] is None:
+      heapq.heappop(heap)
+    return heap[0][3] if heap else None
+
+  def pop(self) -> Node:
+    """
+    Removes and returns the node with the lowest (f, h).
+
+    Returns:
+    - Node: The best node in the open list.
+
+    Raises:
+    - KeyError: If the open list is empty.
+    """
+
+    while self._heap:
+      node = heapq.heappop(self._heap)[3]
+      if node is not None:
+        del self._entries[node.state]
+        return node
+    raise KeyError('pop from an empty open list')
+
+class SearchStats:
+  """
+  Collects counters, timings and hook calls for one search.
+
+  Node counts are always kept. Timings, peak open/closed sizes and the hooks only run when
+  detailed is set or a hook is given, so an uninstrumented search pays for nothing but a
+  few integer increments. Timings are measured by solve_astar; peaks by the solvers with an
+  open list and closed set (solve_astar, solve_anytime).
+
+  Parameters:
+  - detailed (bool, optional): Time heuristic, neighbor and heap work and track peak sizes. Default is False.
+  - on_expand (callable, optional): Called with each Node as it is expanded.
+  - on_generate (callable, optional): Called with each child Node as it is generated.
+  - on_solution (callable, optional): Called with each solution path as it is found.
+
+  Attributes:
+  - expanded (int): The number of nodes expanded.
+  - generated (int): The number of child nodes generated.
+  - duplicates (int): The number of children pruned as already expanded or already queued as cheaply.
+  - peak_open (int): The largest open list size (detailed only).
+  - peak_closed (int): The largest closed set size (detailed only).
+  - heuristic_time (float): Seconds spent computing heuristics (detailed only).
+  - neighbor_time (float): Seconds spent generating neighbors (detailed only).
+  - heap_time (float): Seconds spent in open list operations (detailed only).
+  - f_bounds (list[int]): Each new f-value reached in best-first order, or each IDA* bound.
+
+  Methods:
+  - instrumented() -> bool: True if timings or hooks are enabled.
+  - timed(fn, field: str): Wraps a function so its run time is added to a timing attribute.
+  - as_dict() -> dict: The counters and timings as a plain dict.
+  """
+
+  def __init__(self, detailed: bool = False, on_expand=None, on_generate=None, on_solution=None) -> None:
+    self.detailed: bool = detailed
+    self.on_expand = on_expand
+    self.on_generate = on_generate
+    self.on_solution = on_solution
+
+    self.expanded: int = 0
+    self.generated: int = 0
+    self.duplicates: int = 0
+    self.peak_open: int = 0
+    self.peak_closed: int = 0
+    self.heuristic_time: float = 0.0
+    self.neighbor_time: float = 0.0
+    self.heap_time: float = 0.0
+    self.f_bounds: list[int] = []
+
+  def instrumented(self) -> bool:
+    return self.detailed or self.on_expand is not None or self.on_generate is not None
+
+  def timed(self, fn, field: str):
+    """
+    Wraps a function so the time spent in it is added to one of the timing attributes.
+
+    Args:
+    - fn (callable): The function to time.
+    - field (str): The attribute to add to ('heuristic_time', 'neighbor_time' or 'heap_time').
+
+    Returns:
+    - callable: The wrapped function.
+    """
+
+    def wrapper(*args):
+      start = perf_counter()
+      result = fn(*args)
+      setattr(self, field, getattr(self, field) + perf_counter() - start)
+      return result
+    return wrapper
+
+  def as_dict(self) -> dict:
+    """
+    Returns the counters and timings as a plain dict (for JSON output).
+
+    Returns:
+    - dict: Every counter and timing, keyed by attribute name.
+    """
+
+    return {
+      'expanded': self.expanded,
+      'generated': self.generated,
+      'duplicates': self.duplicates,
+      'peak_open': self.peak_open,
+      'peak_closed': self.peak_closed,
+      'heuristic_time': self.heuristic_time,
+      'neighbor_time': self.neighbor_time,
+      'heap_time': self.heap_time,
+      'f_bounds': self.f_bounds
+    }
+
+# Table files
+
+def save_table(table, path: str) -> None:
+  """
+  Writes a table to disk, creating its directory if needed. The file is written under a
+  temporary name and renamed, so processes building the same table at once never map a partly
+  written file.
+
+  Args:
+  - table (bytearray): The table.
+  - path (str): The destination file.
+  """
+
+  directory: str = os.path.dirname(path)
+  if directory:
+    os.makedirs(directory, exist_ok=True)
+  temporary: str = f'{path}.{os.getpid()}'
+  try:
+    with open(temporary, 'wb') as file:
+      file.write(table)
+    os.replace(temporary, path)
+  except OSError:
+    if os.path.exists(temporary):
+      os.unlink(temporary)
+    raise
+
+def load_table(path: str, length: int) -> mmap.mmap:
+  """
+  Memory-maps a table read-only, so pages are shared between processes.
+
+  Args:
+  - path (str): The table file.
+  - length (int): The expected size in bytes.
+
+  Returns:
+  - mmap.mmap: The mapped table.
+
+  Raises:
+  - FileNotFoundError: If the file does not exist.
+  - ValueError: If the file is not length bytes long (e.g. empty or truncated).
+  """
+
+  with open(path, 'rb') as file:
+    if os.fstat(file.fileno()).st_size != length:
+      raise ValueError(f'{path} has {os.fstat(file.fileno()).st_size} bytes, expected {length}')
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+def cached_table(path: str, length: int, build):
+  """
+  Loads a table from its file, building and saving it first if the file is missing or the wrong
+  size. When the file cannot be written the table is kept in memory only.
+
+  Args:
+  - path (str): The table file.
+  - length (int): The expected size in bytes.
+  - build (callable): Builds the table; called with no arguments.
+
+  Returns:
+  - mmap.mmap or bytearray: The table.
+  """
+
+  try:
+    return load_table(path, length)
+  except (FileNotFoundError, ValueError):
+    pass
+  table = build()
+  try:
+    save_table(table, path)
+  except OSError:
+    return table
+  return load_table(path, length)
@@ -0,0 +1,184 @@
+"""NumPy engine that expands and scores whole layers of boards at once."""
+
+import numpy as np
+import utils
+
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def _tables(side: int) -> tuple[np.ndarray, np.ndarray]:
+  """
+  Builds the NumPy move and Manhattan tables for a square board.
+
+  Args:
+  - side (int): The side length of the board.
+
+  Returns:
+  - tuple[np.ndarray, np.ndarray]: (moves, dist) where moves[z] lists the blank's targets padded
+    with -1 to four columns, and dist[tile, index] is the Manhattan distance of tile at index.
+  """
+
+  n: int = side * side
+  moves: np.ndarray = np.full((n, 4), -1, dtype=np.intp)
+  for z_index, targets in enumerate(utils.move_tables(side)):
+    moves[z_index, :len(targets)] = targets
+  dist: np.ndarray = np.array(utils.manhattan_tables(side)[0], dtype=np.int16)
+  return moves, dist
+
+def to_array(states: list[list[int]]) -> np.ndarray:
+  """
+  Converts a list of states to a frontier array.
+
+  Args:
+  - states (list[list[int]]): The states represented as lists of integers.
+
+  Returns:
+  - np.ndarray: A uint8 array with one row per board.
+  """
+
+  return np.array(states, dtype=np.uint8).reshape(len(states), -1)
+
+def expand(frontier: np.ndarray, side: int) -> tuple[np.ndarray, np.ndarray]:
+  """
+  Generates every neighbor of every board in the frontier.
+
+  Args:
+  - frontier (np.ndarray): The boards, one row each.
+  - side (int): The side length of the board.
+
+  Returns:
+  - tuple[np.ndarray, np.ndarray]: (children, parents) where children holds one row per
+    neighbor and parents[i] is the frontier row that children[i] came from.
+  """
+
+  moves, _ = _tables(side)
+  z_index: np.ndarray = np.argmin(frontier, axis=1)
+  children: list[np.ndarray] = []
+  parents: list[np.ndarray] = []
+  for direction in range(4):
+    targets = moves[z_index, direction]
+    rows = np.nonzero(targets >= 0)[0]
+    if rows.size == 0:
+      continue
+    src = targets[rows]
+    dst = z_index[rows]
+    child = frontier[rows].copy()
+    arange = np.arange(rows.size)
+    child[arange, dst] = child[arange, src]
+    child[arange, src] = 0
+    children.append(child)
+    parents.append(rows)
+
+  if not children:
+    return frontier[:0].copy(), np.empty(0, dtype=np.intp)
+  return np.concatenate(children), np.concatenate(parents)
+
+def manhattan(states: np.ndarray, side: int) -> np.ndarray:
+  """
+  Scores every board with the Manhattan distance heuristic.
+
+  Args:
+  - states (np.ndarray): The boards, one row each.
+  - side (int): The side length of the board.
+
+  Returns:
+  - np.ndarray: The heuristic value of each board.
+  """
+
+  _, dist = _tables(side)
+  return dist[states, np.arange(states.shape[1])].sum(axis=1)
+
+def rank(states: np.ndarray) -> np.ndarray:
+  """
+  Ranks every board with the Lehmer code, matching utils.rank.
+
+  Args:
+  - states (np.ndarray): The boards, one row each, with at most 20 cells so ranks fit in int64.
+
+  Returns:
+  - np.ndarray: The int64 rank of each board.
+
+  Raises:
+  - ValueError: If the boards have more than 20 cells.
+  """
+
+  n: int = states.shape[1]
+  if n > 20:
+    raise ValueError(f'ranks of {n}-cell boards do not fit in int64')
+  ranks: np.ndarray = np.zeros(states.shape[0], dtype=np.int64)
+  for i in range(n - 1):
+    smaller = (states[:, i + 1:] < states[:, i:i + 1]).sum(axis=1)
+    ranks += smaller * utils.factorials[n - 1 - i]
+  return ranks
+
+def keys(states: np.ndarray) -> np.ndarray:
+  """
+  Encodes every board as one sortable integer for deduplication.
+
+  Args:
+  - states (np.ndarray): The boards, one row each, with at most 16 cells.
+
+  Returns:
+  - np.ndarray: A uint64 key per board, packed 4 bits per cell like utils.pack.
+
+  Raises:
+  - ValueError: If the boards have more than 16 cells.
+  """
+
+  n: int = states.shape[1]
+  if n > 16:
+    raise ValueError(f'{n}-cell boards do not fit in a 64-bit key')
+  shifts: np.ndarray = np.arange(n, dtype=np.uint64) * np.uint64(utils.tile_bits)
+  return np.bitwise_or.reduce(states.astype(np.uint64) << shifts, axis=1)
+
+def bfs_layers(start: np.ndarray, side: int, max_depth: int = None):
+  """
+  Runs breadth-first search one whole layer at a time.
+
+  Duplicates inside a layer are removed with np.unique, and states from earlier layers with
+  a sorted lookup against the keys seen so far.
+
+  Args:
+  - start (np.ndarray): The boards in layer 0, one row each.
+  - side (int): The side length of the board, at most 4.
+  - max_depth (int, optional): The last layer to produce. Default is no limit.
+
+  Yields:
+  - tuple[int, np.ndarray]: The depth and the boards first reached at that depth.
+  """
+
+  layer_keys, first = np.unique(keys(start), return_index=True)
+  layer: np.ndarray = start[first]
+  seen: np.ndarray = layer_keys
+  depth: int = 0
+
+  while layer.shape[0]:
+    yield depth, layer
+    if max_depth is not None and depth >= max_depth:
+      return
+
+    children, _ = expand(layer, side)
+    child_keys, first = np.unique(keys(children), return_index=True)
+    fresh = ~np.isin(child_keys, seen, assume_unique=True)
+    layer = children[first[fresh]]
+    seen = np.union1d(seen, child_keys[fresh])
+    depth += 1
+
+def build_distance_table(goal_state: list[int] = None) -> bytearray:
+  """
+  Builds the 8-puzzle distance table with layer-by-layer BFS; see table.build_distance_table.
+
+  Args:
+  - goal_state (list[int], optional): The goal state. Default is the identity permutation.
+
+  Returns:
+  - bytearray: table[rank(state)] is the optimal solution length of state, or 0xFF if unreachable.
+  """
+
+  if goal_state is None:
+    goal_state = list(range(utils.num_tiles))
+
+  distances: np.ndarray = np.full(utils.factorials[utils.num_tiles], 0xFF, dtype=np.uint8)
+  for depth, layer in bfs_layers(to_array([goal_state]), utils.board_len):
+    distances[rank(layer)] = depth
+  return bytearray(distances.tobytes())
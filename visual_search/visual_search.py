@@ -3,9 +3,12 @@
 import pygame as pg
 
 from pygame.locals import *
+from client import find_server
 from puzzle import EightPuzzle
 from components import TileGroup, TextBox, Speedometer
+from generate import random_state
 from utils import controls_fp
+from worker import SolverWorker
 
 pg.init()
 
@@ -26,14 +29,33 @@ if __name__ == '__main__':
   speedometer.rect.topleft = width//2, textbox.rect.height
 
   state_queue: list[list[int]] = []
+  worker: SolverWorker = None
+  # A solver server started with server.py keeps its tables warm; A* is sent there if one is running
+  server = find_server()
+
+  # Paint the whole window once; after that only changed areas are redrawn
+  screen.fill('black')
+  redraw_all: bool = True
 
   running = True
   while running:
-    for e in pg.event.get():
+    # With nothing to animate or poll, sleep until the next event instead of spinning
+    if state_queue or worker:
+      events = pg.event.get()
+    else:
+      events = [pg.event.wait()] + pg.event.get()
+
+    for e in events:
+      if e.type == QUIT:
+        running = False
+      if e.type in (VIDEOEXPOSE, WINDOWEXPOSED):
+        redraw_all = True
       if e.type == KEYDOWN:
         if e.key == K_ESCAPE or e.key == K_q:
           running = False
-        if state_queue:
+        if e.key == K_c and worker:
+          worker.cancel()
+        if state_queue or worker:
           continue
         # Check K_1 to K_8
         for value in range(K_1, K_1+8):
@@ -43,15 +65,40 @@ if __name__ == '__main__':
             except ValueError as error:
               print(error)
         if e.key == K_a:
-          state_queue = p.solve_astar()
-          queue_start_time = pg.time.get_ticks()
+          worker = SolverWorker(p.state, 'solve_astar', server)
+        if e.key == K_f:
+          worker = SolverWorker(p.state, 'solve_anytime')
         if e.key == K_s:
-          p.shuffle(k=10000)
+          p.set(random_state(p.side, p.goal_state))
         if e.key == K_DOWN and queue_delay_time > 100:
           queue_delay_time -= 100
         if e.key == K_UP:
           queue_delay_time += 100
     
+    # Check on the background solver
+    if worker:
+      done = worker.poll()
+      path = worker.take_solution()
+      if path and not state_queue:
+        state_queue = path
+        queue_start_time = pg.time.get_ticks()
+      elif path:
+        # Switch to a better path only if playback has not yet passed the point where they differ
+        played = (pg.time.get_ticks() - queue_start_time) // queue_delay_time
+        if path[:played + 1] == state_queue[:played + 1]:
+          state_queue = path
+
+      if done:
+        if worker.error is not None:
+          pg.display.set_caption(f'Failed: {worker.error}')
+        elif worker.cancelled:
+          pg.display.set_caption('Cancelled')
+        else:
+          pg.display.set_caption(f'Solved: {worker.expanded} nodes expanded')
+        worker = None
+      else:
+        pg.display.set_caption(f'Solving... {worker.expanded} nodes expanded, f <= {worker.bound}')
+
     # Handle the queue
     if state_queue:
       # Index is based on the number of ticks that has passed
@@ -64,18 +111,31 @@ if __name__ == '__main__':
       else:
         tilegroup.highlighted = False
         state_queue = []
+        # A better path can no longer be played, so stop refining
+        if worker:
+          worker.cancel()
+          worker = None
      
-    # Clear the frame
-    screen.fill('black')
+    # Clear the frame only when everything has to be repainted
+    if redraw_all:
+      screen.fill('black')
+      tilegroup.invalidate()
+      textbox.invalidate()
+      speedometer.invalidate()
     
-    # Update and draw the tiles to the screen
+    # Update the components and draw only what changed
     tilegroup.update_statestr(p.statestr)
-    tilegroup.draw(screen)
-    textbox.draw(screen)
     speedometer.set_speed(queue_delay_time)
-    speedometer.draw(screen)
-    pg.display.flip()
+    rects: list[pg.Rect] = tilegroup.draw(screen) + textbox.draw(screen) + speedometer.draw(screen)
+    if redraw_all:
+      pg.display.flip()
+      redraw_all = False
+    elif rects:
+      pg.display.update(rects)
 
     clock.tick(60)
 
+  if worker:
+    worker.cancel()
+
 pg.quit()
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""Runs a solver in a background process so the window keeps responding."""
+
+import inspect
+import multiprocessing as mp
+import queue
+import time
+
+from client import SolverClient
+from puzzle import SearchCancelled, SlidingPuzzle
+
+# Minimum time between progress messages, in seconds
+report_interval: float = 0.05
+
+# Solver methods a solver server can run, by their name in the server's protocol
+remote_solvers: dict[str, str] = {'solve_astar': 'astar', 'solve_idastar': 'idastar', 'solve_table': 'table'}
+
+def _run(state: list[int], solver: str, messages: mp.Queue, cancel) -> None:
+  """
+  Solves a state and reports back through a queue. Runs in the worker process.
+
+  Messages are ('progress', nodes_expanded, f_bound) and, for generator solvers, ('solution', path)
+  for each path yielded, then one of ('result', path), ('cancelled',) or ('failed', message).
+
+  Args:
+  - state (list[int]): The state to solve.
+  - solver (str): The name of the solver method. It is passed a progress callback if it takes one,
+    and may be a generator of improving paths (see SlidingPuzzle.solve_anytime).
+  - messages (mp.Queue): The queue to the UI process.
+  - cancel (mp.Event): Set by the UI process to stop the search.
+  """
+
+  last_report: float = 0.0
+
+  def progress(expanded: int, bound: int) -> None:
+    nonlocal last_report
+    if cancel.is_set():
+      raise SearchCancelled()
+    now = time.monotonic()
+    if now - last_report >= report_interval:
+      last_report = now
+      messages.put(('progress', expanded, bound))
+
+  try:
+    puzzle = SlidingPuzzle(state)
+    method = getattr(puzzle, solver)
+    # Solvers without a progress callback (solve_table) cannot report or be cancelled midway
+    options: dict = {'progress': progress} if 'progress' in inspect.signature(method).parameters else {}
+    path = method(**options)
+    if inspect.isgenerator(path):
+      solutions, path = path, None
+      for path in solutions:
+        messages.put(('solution', path))
+  except SearchCancelled:
+    messages.put(('cancelled',))
+    return
+  except Exception as error:
+    messages.put(('failed', f'{type(error).__name__}: {error}'))
+    return
+  messages.put(('progress', puzzle.nodes_expanded, len(path) - 1 if path else 0))
+  messages.put(('result', path))
+
+def _run_remote(state: list[int], solver: str, address, messages: mp.Queue, cancel) -> None:
+  """
+  Solves a state on a solver server and reports back like _run; falls back to solving locally
+  if the server cannot be reached. Runs in the worker process.
+
+  A request in flight cannot be interrupted, so a cancel only takes effect once it returns.
+
+  Args:
+  - state (list[int]): The state to solve.
+  - solver (str): The name of the solver method, a key of remote_solvers.
+  - address (str or tuple[str, int]): The server's address.
+  - messages (mp.Queue): The queue to the UI process.
+  - cancel (mp.Event): Set by the UI process to stop the search.
+  """
+
+  try:
+    with SolverClient(address) as client:
+      path = client.solve(state, remote_solvers[solver])
+  except (OSError, ValueError):
+    _run(state, solver, messages, cancel)
+    return
+  if cancel.is_set():
+    messages.put(('cancelled',))
+    return
+  messages.put(('progress', client.expanded, len(path) - 1 if path else 0))
+  messages.put(('result', path))
+
+class SolverWorker:
+  """
+  Handle to a solve running in a separate process.
+
+  The UI calls poll once per frame; it never blocks.
+
+  Parameters:
+  - state (list[int]): The state to solve.
+  - solver (str, optional): The name of the solver method. Default is solve_astar.
+  - address (str or tuple[str, int], optional): A solver server (see server.py) to send the solve to,
+    for the methods in remote_solvers. Default is None (solve in the worker process).
+
+  Attributes:
+  - expanded (int): The number of nodes expanded so far.
+  - bound (int): The current f-bound of the search.
+  - result (list[list[int]]): The best solution path so far, or None.
+  - done (bool): True once the search has finished, failed or been cancelled.
+  - cancelled (bool): True if the search was cancelled.
+  - error (str): Why the search failed (the solver raised or the worker died), or None.
+
+  Methods:
+  - poll() -> bool: Reads pending messages from the worker and returns done.
+  - take_solution() -> list[list[int]]: Returns a solution that has not been taken yet, or None.
+  - cancel(): Asks the worker to stop.
+  """
+
+  def __init__(self, state: list[int], solver: str = 'solve_astar', address=None) -> None:
+    self.expanded: int = 0
+    self.bound: int = 0
+    self.result: list[list[int]] = None
+    self.done: bool = False
+    self.cancelled: bool = False
+    self.error: str = None
+    self._fresh: list[list[int]] = None
+
+    self._messages: mp.Queue = mp.Queue()
+    self._cancel = mp.Event()
+    if address is not None and solver in remote_solvers:
+      target, args = _run_remote, (list(state), solver, address, self._messages, self._cancel)
+    else:
+      target, args = _run, (list(state), solver, self._messages, self._cancel)
+    self._process = mp.Process(target=target, args=args, daemon=True)
+    self._process.start()
+
+  def poll(self) -> bool:
+    """
+    Reads every pending message from the worker without blocking.
+
+    Returns:
+    - bool: True once the search has finished, failed or been cancelled.
+    """
+
+    while not self.done:
+      try:
+        message = self._messages.get_nowait()
+      except queue.Empty:
+        if not self._process.is_alive() and self._messages.empty():
+          # The worker died without reporting
+          self.error = f'the solver process exited with code {self._process.exitcode}'
+          self.done = True
+        break
+
+      if message[0] == 'progress':
+        self.expanded, self.bound = message[1], message[2]
+      elif message[0] == 'solution':
+        self.result = self._fresh = message[1]
+      elif message[0] == 'result':
+        if message[1] != self.result:
+          self.result = self._fresh = message[1]
+        self.done = True
+      elif message[0] == 'cancelled':
+        self.cancelled = True
+        self.done = True
+      elif message[0] == 'failed':
+        self.error = message[1]
+        self.done = True
+
+    if self.done:
+      self._process.join(timeout=0)
+    return self.done
+
+  def take_solution(self) -> list[list[int]]:
+    """
+    Returns the newest solution received since the last call, if any.
+
+    Returns:
+    - list[list[int]] or None: The solution path, or None if nothing new has arrived.
+    """
+
+    path, self._fresh = self._fresh, None
+    return path
+
+  def cancel(self) -> None:
+    """
+    Asks the worker to stop at its next progress check.
+    """
+
+    self._cancel.set()